@@ -5,8 +5,7 @@ import { fetchTrades } from '@/lib/api'
 
 export default function TradesList() {
   const [trades, setTrades] = useState<any[]>([])
-  const [currentPage, setCurrentPage] = useState(1)
-  const [totalPages, setTotalPages] = useState(1)
+  const [nextCursor, setNextCursor] = useState<number | null>(null)
   const [total, setTotal] = useState(0)
   const [loading, setLoading] = useState(false)
   const [hasMore, setHasMore] = useState(true)
@@ -26,18 +25,19 @@ export default function TradesList() {
     return symbol.split('/')[0] || symbol
   }
 
-  const loadTrades = async (page: number) => {
+  const loadTrades = async (cursor: number | null) => {
     if (loading) return
     
     setLoading(true)
     try {
-      const response = await fetchTrades(page, pageSize)
+      const response = await fetchTrades(cursor, pageSize)
       
       if (response.data && response.data.length > 0) {
-        setTrades(prev => page === 1 ? response.data : [...prev, ...response.data])
-        setTotal(response.total)
-        setTotalPages(response.total_pages)
-        setHasMore(page < response.total_pages)
+        setTrades(prev => cursor === null ? response.data : [...prev, ...response.data])
+        // 总数只在第一页返回
+        if (response.total !== undefined) setTotal(response.total)
+        setNextCursor(response.next_cursor)
+        setHasMore(response.has_more)
       } else {
         setHasMore(false)
       }
@@ -50,7 +50,7 @@ export default function TradesList() {
 
   // 初始加载
   useEffect(() => {
-    loadTrades(1)
+    loadTrades(null)
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [])
 
@@ -61,11 +61,7 @@ export default function TradesList() {
     observerRef.current = new IntersectionObserver(
       (entries) => {
         if (entries[0].isIntersecting && !loading && hasMore) {
-          setCurrentPage(prev => {
-            const nextPage = prev + 1
-            loadTrades(nextPage)
-            return nextPage
-          })
+          loadTrades(nextCursor)
         }
       },
       { threshold: 0.1 }
@@ -81,7 +77,7 @@ export default function TradesList() {
       }
     }
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [loading, hasMore])
+  }, [loading, hasMore, nextCursor])
 
   return (
     <div className="space-y-3">
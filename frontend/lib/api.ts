@@ -49,8 +49,9 @@ export async function fetchPriceHistory(symbol: string, hours: number = 24) {
   return res.json()
 }
 
-export async function fetchTrades(page: number = 1, pageSize: number = 10) {
-  const res = await fetch(`${API_BASE}/api/trades?page=${page}&page_size=${pageSize}`)
+export async function fetchTrades(cursor: number | null = null, pageSize: number = 10) {
+  const query = cursor === null ? '' : `cursor=${cursor}&`
+  const res = await fetch(`${API_BASE}/api/trades?${query}page_size=${pageSize}`)
   if (!res.ok) throw new Error('Failed to fetch trades')
   return res.json()
 }
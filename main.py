@@ -10,6 +10,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.trading_bot import TradingBot
+from src.event_loop import install_event_loop_policy
 
 
 def setup_logging():
@@ -42,6 +43,7 @@ async def main():
     logger.info("AI-DRIVEN CRYPTOCURRENCY TRADING SYSTEM")
     logger.info("Based on nof1.ai architecture")
     logger.info("=" * 80)
+    logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
     
     # Import config for display
     from src.config import settings, trading_config
@@ -151,6 +153,7 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_event_loop_policy()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
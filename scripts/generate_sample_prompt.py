@@ -3,6 +3,7 @@
 
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -14,27 +15,30 @@ from src.data.indicator_engine import IndicatorEngine
 def create_sample_data(coin='BTC', start_price=110000):
     """创建示例市场数据"""
     engine = IndicatorEngine()
+    steps = np.arange(100)
     
     # 创建100根3分钟K线
+    base_3m = start_price + steps * 10
     data_3m = {
         'timestamp': pd.date_range('2024-01-01', periods=100, freq='3min'),
-        'open': [start_price + i * 10 for i in range(100)],
-        'high': [start_price + i * 10 + 50 for i in range(100)],
-        'low': [start_price + i * 10 - 50 for i in range(100)],
-        'close': [start_price + i * 10 + 20 for i in range(100)],
-        'volume': [1000 + i * 5 for i in range(100)]
+        'open': base_3m,
+        'high': base_3m + 50,
+        'low': base_3m - 50,
+        'close': base_3m + 20,
+        'volume': 1000 + steps * 5
     }
     df_3m = pd.DataFrame(data_3m)
     df_3m = engine.add_all_indicators(df_3m)
     
     # 创建100根4小时K线
+    base_4h = start_price + steps * 100
     data_4h = {
         'timestamp': pd.date_range('2024-01-01', periods=100, freq='4H'),
-        'open': [start_price + i * 100 for i in range(100)],
-        'high': [start_price + i * 100 + 200 for i in range(100)],
-        'low': [start_price + i * 100 - 200 for i in range(100)],
-        'close': [start_price + i * 100 + 50 for i in range(100)],
-        'volume': [5000 + i * 20 for i in range(100)]
+        'open': base_4h,
+        'high': base_4h + 200,
+        'low': base_4h - 200,
+        'close': base_4h + 50,
+        'volume': 5000 + steps * 20
     }
     df_4h = pd.DataFrame(data_4h)
     df_4h = engine.add_all_indicators(df_4h)
@@ -9,6 +9,14 @@ from .decision_models import TradingDecisions, CoinDecision, TradeSignalArgs
 
 logger = logging.getLogger(__name__)
 
+# 可选：orjson（C实现，解析更快）；未安装时回退到标准库json
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，现有异常处理无需修改
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 
 class OutputParserException(Exception):
     """Custom exception for parsing errors."""
@@ -50,7 +58,7 @@ class TradingDecisionParser:
             json_text = self._extract_json(cleaned_text)
             
             # Step 3: Parse JSON
-            raw_data = json.loads(json_text)
+            raw_data = json_loads(json_text)
             
             # Step 4: Validate with Pydantic
             validated = self._validate_with_pydantic(raw_data)
@@ -12,9 +12,27 @@ logger = logging.getLogger(__name__)
 class PromptBuilder:
     """Build structured prompts exactly matching nof1.ai format."""
     
+    # 按固定顺序输出的币种
+    COIN_ORDER = ('BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE')
+    
     def __init__(self):
         self.call_count = 0
         self.start_time = datetime.now()
+        
+        # 预先构建不变的提示词骨架，每次迭代只渲染变化的部分
+        self._system_prompt = self._build_system_prompt()
+        self._static_header = (
+            " Below, we are providing you with a variety of state data, price data, "
+            "and predictive signals so you can discover alpha. "
+            "Below that is your current account information, value, performance, "
+            "positions, etc.\n\n"
+            "ALL OF THE PRICE OR SIGNAL DATA BELOW IS ORDERED: OLDEST → NEWEST\n\n"
+            "Timeframes note: Unless stated otherwise in a section title, "
+            "intraday series are provided at 3‑minute intervals. "
+            "If a coin uses a different interval, "
+            "it is explicitly stated in that coin's section.\n\n"
+            "CURRENT MARKET STATE FOR ALL COINS\n"
+        )
     
     def get_system_prompt(self) -> str:
         """
@@ -23,6 +41,11 @@ class PromptBuilder:
         Returns:
             System prompt string with format instructions
         """
+        return self._system_prompt
+    
+    @staticmethod
+    def _build_system_prompt() -> str:
+        """Build the constant system prompt (cached in __init__)."""
         return """You are an expert cryptocurrency trading AI. Analyze market data and make trading decisions.
 
 OUTPUT FORMAT REQUIREMENTS:
@@ -78,80 +101,84 @@ CRITICAL: Your ENTIRE response must be valid JSON only. Start with { and end wit
         minutes_running = int((datetime.now() - self.start_time).total_seconds() / 60)
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
         
-        prompt = f"""It has been {minutes_running} minutes since you started trading. The current time is {current_time} and you've been invoked {self.call_count} times. Below, we are providing you with a variety of state data, price data, and predictive signals so you can discover alpha. Below that is your current account information, value, performance, positions, etc.
-
-ALL OF THE PRICE OR SIGNAL DATA BELOW IS ORDERED: OLDEST → NEWEST
-
-Timeframes note: Unless stated otherwise in a section title, intraday series are provided at 3‑minute intervals. If a coin uses a different interval, it is explicitly stated in that coin's section.
-
-CURRENT MARKET STATE FOR ALL COINS
-"""
+        parts = [
+            f"It has been {minutes_running} minutes since you started trading. "
+            f"The current time is {current_time} and you've been invoked {self.call_count} times.",
+            self._static_header
+        ]
         
         # Build market data section for each coin
-        for coin in ['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE']:
+        for coin in self.COIN_ORDER:
             if coin in market_data:
-                prompt += self._format_coin_data(coin, market_data[coin])
+                parts.append(self._format_coin_data(coin, market_data[coin]))
         
         # Build account section
-        prompt += self._format_account_section(account_state, positions)
+        parts.append(self._format_account_section(account_state, positions))
         
-        return prompt
+        return "".join(parts)
     
     def _format_coin_data(self, coin: str, data: Dict) -> str:
         """Format market data for one coin exactly matching nof1.ai format."""
         intraday = data['intraday_df']
         longterm = data['longterm_df']
         
-        # Get latest values
-        latest = intraday.iloc[-1]
+        # Get latest values（按列取标量，避免 iloc[-1] 构造整行Series）
         last_10 = intraday.tail(10)
         
-        section = f"ALL {coin} DATA\n"
-        # current_price保持原始格式，不强制格式化
-        section += f"current_price = {latest['close']}, "
-        section += f"current_ema20 = {latest['ema_20']:.3f}, "
-        section += f"current_macd = {latest['macd']:.3f}, "
-        section += f"current_rsi (7 period) = {latest['rsi_7']:.3f}\n\n"
-        
-        # Perpetual contract data
-        section += f"In addition, here is the latest {coin} open interest and funding rate for perps (the instrument you are trading):\n\n"
-        section += f"Open Interest: Latest: {data['open_interest']:.2f} Average: {data['oi_average']:.2f}\n\n"
-        section += f"Funding Rate: {data['funding_rate']:.6e}\n\n"
+        fmt = self._format_list
+        parts = [
+            f"ALL {coin} DATA\n",
+            # current_price保持原始格式，不强制格式化
+            f"current_price = {intraday['close'].iat[-1]}, "
+            f"current_ema20 = {intraday['ema_20'].iat[-1]:.3f}, "
+            f"current_macd = {intraday['macd'].iat[-1]:.3f}, "
+            f"current_rsi (7 period) = {intraday['rsi_7'].iat[-1]:.3f}\n\n",
+            
+            # Perpetual contract data
+            f"In addition, here is the latest {coin} open interest and funding rate for perps (the instrument you are trading):\n\n"
+            f"Open Interest: Latest: {data['open_interest']:.2f} Average: {data['oi_average']:.2f}\n\n"
+            f"Funding Rate: {data['funding_rate']:.6e}\n\n"
+        ]
         
         # Intraday series - BTC默认是3分钟，其他币种需要明确说明
         if coin == 'BTC':
-            section += "Intraday series (by minute, oldest → latest):\n\n"
-            section += f"Mid prices: {self._format_list(last_10['close'])}\n\n"
+            parts.append("Intraday series (by minute, oldest → latest):\n\n")
+            parts.append(f"Mid prices: {fmt(last_10['close'])}\n\n")
         else:
             # ETH, SOL, BNB, XRP, DOGE 需要明确说明是3分钟间隔
-            section += "Intraday series (3‑minute intervals, oldest → latest):\n\n"
-            section += f"{coin} mid prices: {self._format_list(last_10['close'])}\n\n"
+            parts.append("Intraday series (3‑minute intervals, oldest → latest):\n\n")
+            parts.append(f"{coin} mid prices: {fmt(last_10['close'])}\n\n")
         
-        section += f"EMA indicators (20‑period): {self._format_list(last_10['ema_20'])}\n\n"
-        section += f"MACD indicators: {self._format_list(last_10['macd'])}\n\n"
-        section += f"RSI indicators (7‑Period): {self._format_list(last_10['rsi_7'])}\n\n"
-        section += f"RSI indicators (14‑Period): {self._format_list(last_10['rsi_14'])}\n\n"
+        parts.append(
+            f"EMA indicators (20‑period): {fmt(last_10['ema_20'])}\n\n"
+            f"MACD indicators: {fmt(last_10['macd'])}\n\n"
+            f"RSI indicators (7‑Period): {fmt(last_10['rsi_7'])}\n\n"
+            f"RSI indicators (14‑Period): {fmt(last_10['rsi_14'])}\n\n"
+        )
         
         # Longer-term context (4-hour timeframe)
-        lt_latest = longterm.iloc[-1]
         lt_last_10 = longterm.tail(10)
         
-        section += "Longer‑term context (4‑hour timeframe):\n\n"
-        section += f"20‑Period EMA: {lt_latest['ema_20']:.3f} vs. 50‑Period EMA: {lt_latest['ema_50']:.3f}\n\n"
-        
         # Calculate ATR for 3-period and 14-period on 4H data
-        atr_3 = longterm['atr_14'].tail(3).mean() if 'atr_14' in longterm.columns else 0
-        atr_14 = lt_latest.get('atr_14', 0)
-        section += f"3‑Period ATR: {atr_3:.3f} vs. 14‑Period ATR: {atr_14:.3f}\n\n"
+        if 'atr_14' in longterm.columns:
+            atr_3 = longterm['atr_14'].tail(3).mean()
+            atr_14 = longterm['atr_14'].iat[-1]
+        else:
+            atr_3 = atr_14 = 0
         
         # Volume comparison
         avg_volume = longterm['volume'].mean()
-        section += f"Current Volume: {lt_latest['volume']:.3f} vs. Average Volume: {avg_volume:.3f}\n\n"
         
-        section += f"MACD indicators: {self._format_list(lt_last_10['macd'])}\n\n"
-        section += f"RSI indicators (14‑Period): {self._format_list(lt_last_10['rsi_14'])}\n\n"
+        parts.append(
+            "Longer‑term context (4‑hour timeframe):\n\n"
+            f"20‑Period EMA: {longterm['ema_20'].iat[-1]:.3f} vs. 50‑Period EMA: {longterm['ema_50'].iat[-1]:.3f}\n\n"
+            f"3‑Period ATR: {atr_3:.3f} vs. 14‑Period ATR: {atr_14:.3f}\n\n"
+            f"Current Volume: {longterm['volume'].iat[-1]:.3f} vs. Average Volume: {avg_volume:.3f}\n\n"
+            f"MACD indicators: {fmt(lt_last_10['macd'])}\n\n"
+            f"RSI indicators (14‑Period): {fmt(lt_last_10['rsi_14'])}\n\n"
+        )
         
-        return section
+        return "".join(parts)
     
     def _format_list(self, series) -> str:
         """
@@ -164,22 +191,23 @@ CURRENT MARKET STATE FOR ALL COINS
     
     def _format_account_section(self, account: Dict, positions: List[Dict]) -> str:
         """Format account information exactly matching nof1.ai format."""
-        section = "HERE IS YOUR ACCOUNT INFORMATION & PERFORMANCE\n"
-        section += f"Current Total Return (percent): {account.get('total_return', 0):.2f}%\n\n"
-        section += f"Available Cash: {account.get('cash', 0):.2f}\n\n"
-        section += f"Current Account Value: {account.get('total_value', 0):.2f}\n\n"
+        parts = [
+            "HERE IS YOUR ACCOUNT INFORMATION & PERFORMANCE\n",
+            f"Current Total Return (percent): {account.get('total_return', 0):.2f}%\n\n",
+            f"Available Cash: {account.get('cash', 0):.2f}\n\n",
+            f"Current Account Value: {account.get('total_value', 0):.2f}\n\n"
+        ]
         
         # Format positions exactly as shown in UserPrompt.md
         if positions:
-            section += "Current live positions & performance: "
-            for pos in positions:
-                # Output position dict as string representation
-                section += f"{pos} "
-            section += "\n\n"
+            parts.append("Current live positions & performance: ")
+            # Output position dict as string representation
+            parts.extend(f"{pos} " for pos in positions)
+            parts.append("\n\n")
         else:
-            section += "No current positions.\n\n"
+            parts.append("No current positions.\n\n")
         
-        section += f"Sharpe Ratio: {account.get('sharpe_ratio', 0):.3f}\n\n"
+        parts.append(f"Sharpe Ratio: {account.get('sharpe_ratio', 0):.3f}\n\n")
         
-        return section
+        return "".join(parts)
 
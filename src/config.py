@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     environment: str = Field(default="development", env="ENVIRONMENT")
     enable_paper_trading: bool = Field(default=True, env="ENABLE_PAPER_TRADING")
     use_testnet: bool = Field(default=False, env="USE_TESTNET")  # 使用币安testnet模拟平台
+    use_uvloop: bool = Field(default=True, env="USE_UVLOOP")  # 使用uvloop事件循环（需安装uvloop，Windows不支持）
     
     # Exchange
     binance_api_key: str = Field(default="", env="BINANCE_API_KEY")
@@ -2,9 +2,11 @@
 
 import asyncio
 import logging
+import ssl
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+import aiohttp
 import ccxt.async_support as ccxt
 import pandas as pd
 
@@ -94,6 +96,27 @@ class ExchangeClient:
         
         return exchange_class(config)
     
+    def open(self):
+        """
+        在事件循环中创建共享的HTTP会话（keep-alive连接池 + DNS缓存），
+        所有REST调用复用同一组连接。需在首次请求前调用，否则ccxt会创建默认会话。
+        """
+        exchange = self.exchange
+        if exchange.session is not None:
+            return
+        if exchange.ssl_context is None:
+            exchange.ssl_context = ssl.create_default_context(cafile=exchange.cafile) if exchange.verify else exchange.verify
+        connector = aiohttp.TCPConnector(
+            ssl=exchange.ssl_context,
+            limit=32,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
+        exchange.session = aiohttp.ClientSession(connector=connector, trust_env=exchange.aiohttp_trust_env)
+        # 由ccxt完成事件循环绑定；会话仍由ccxt在 close() 时关闭
+        exchange.open()
+    
     async def load_markets(self):
         """Load market information with retry."""
         if not self.markets_loaded:
@@ -1,7 +1,7 @@
 """Technical indicator calculation engine."""
 
 import logging
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -24,6 +24,99 @@ except ImportError:
     except ImportError:
         logger.info("Using pandas for technical indicators (basic implementation)")
 
+# 可选：Numba JIT内核加速纯pandas实现中的EMA/滚动均值（未安装时使用pandas）
+HAS_NUMBA = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    njit = None
+
+
+def _ema_kernel(x: np.ndarray, span: int) -> np.ndarray:
+    """EMA递推（等价于 ewm(span=span, adjust=False).mean()，输入不含NaN）"""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty(x.shape[0], dtype=np.float64)
+    if x.shape[0] == 0:
+        return out
+    acc = x[0]
+    out[0] = acc
+    for i in range(1, x.shape[0]):
+        acc = alpha * x[i] + (1.0 - alpha) * acc
+        out[i] = acc
+    return out
+
+
+def _rolling_mean_kernel(x: np.ndarray, window: int) -> np.ndarray:
+    """滚动均值（等价于 rolling(window).mean()，输入不含NaN）"""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    acc = 0.0
+    for i in range(n):
+        acc += x[i]
+        if i >= window:
+            acc -= x[i - window]
+        if i >= window - 1:
+            out[i] = acc / window
+    return out
+
+
+def _rolling_mean_std_kernel(x: np.ndarray, window: int):
+    """滚动均值和样本标准差（等价于 rolling(window).mean()/.std()，输入不含NaN）"""
+    n = x.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        # 每个窗口两遍计算（窗口很小），避免累加方差的数值误差
+        acc = 0.0
+        for j in range(i - window + 1, i + 1):
+            acc += x[j]
+        m = acc / window
+        sq = 0.0
+        for j in range(i - window + 1, i + 1):
+            sq += (x[j] - m) ** 2
+        mean[i] = m
+        if window > 1:
+            std[i] = np.sqrt(sq / (window - 1))
+    return mean, std
+
+
+if HAS_NUMBA:
+    _ema_kernel = njit(cache=True)(_ema_kernel)
+    _rolling_mean_kernel = njit(cache=True)(_rolling_mean_kernel)
+    _rolling_mean_std_kernel = njit(cache=True)(_rolling_mean_std_kernel)
+    logger.info("Using Numba kernels for EMA/rolling indicators")
+
+
+def _ema(series: pd.Series, span: int) -> pd.Series:
+    """EMA：有Numba且无NaN时走JIT内核，否则走pandas"""
+    if HAS_NUMBA:
+        values = series.to_numpy(dtype=np.float64)
+        if not np.isnan(values).any():
+            return pd.Series(_ema_kernel(values, span), index=series.index)
+    return series.ewm(span=span, adjust=False).mean()
+
+
+def _rolling_mean(series: pd.Series, window: int) -> pd.Series:
+    """滚动均值：有Numba且无NaN时走JIT内核，否则走pandas"""
+    if HAS_NUMBA:
+        values = series.to_numpy(dtype=np.float64)
+        if not np.isnan(values).any():
+            return pd.Series(_rolling_mean_kernel(values, window), index=series.index)
+    return series.rolling(window=window).mean()
+
+
+def _rolling_mean_std(series: pd.Series, window: int) -> Tuple[pd.Series, pd.Series]:
+    """滚动均值和标准差：有Numba且无NaN时走JIT内核，否则走pandas"""
+    if HAS_NUMBA:
+        values = series.to_numpy(dtype=np.float64)
+        if not np.isnan(values).any():
+            mean, std = _rolling_mean_std_kernel(values, window)
+            return pd.Series(mean, index=series.index), pd.Series(std, index=series.index)
+    rolling = series.rolling(window=window)
+    return rolling.mean(), rolling.std()
+
 
 class IndicatorEngine:
     """Calculate technical indicators from OHLCV data."""
@@ -37,7 +130,7 @@ class IndicatorEngine:
             return df.ta.ema(length=period)
         else:
             # Pure pandas implementation
-            return df['close'].ewm(span=period, adjust=False).mean()
+            return _ema(df['close'], period)
     
     @staticmethod
     def calculate_macd(df: pd.DataFrame) -> Dict[str, pd.Series]:
@@ -59,10 +152,10 @@ class IndicatorEngine:
             }
         else:
             # Pure pandas implementation
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
+            exp1 = _ema(df['close'], 12)
+            exp2 = _ema(df['close'], 26)
             macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
+            signal = _ema(macd, 9)
             histogram = macd - signal
             return {'macd': macd, 'signal': signal, 'histogram': histogram}
     
@@ -76,8 +169,8 @@ class IndicatorEngine:
         else:
             # Pure pandas implementation
             delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+            gain = _rolling_mean(delta.where(delta > 0, 0), period)
+            loss = _rolling_mean(-delta.where(delta < 0, 0), period)
             rs = gain / loss
             return 100 - (100 / (1 + rs))
     
@@ -95,7 +188,7 @@ class IndicatorEngine:
             low_close = np.abs(df['low'] - df['close'].shift())
             ranges = pd.concat([high_low, high_close, low_close], axis=1)
             true_range = ranges.max(axis=1)
-            return true_range.rolling(period).mean()
+            return _rolling_mean(true_range, period)
     
     @staticmethod
     def calculate_bollinger_bands(df: pd.DataFrame, period: int = 20) -> Dict[str, pd.Series]:
@@ -117,8 +210,7 @@ class IndicatorEngine:
             }
         else:
             # Pure pandas implementation
-            middle = df['close'].rolling(window=period).mean()
-            std = df['close'].rolling(window=period).std()
+            middle, std = _rolling_mean_std(df['close'], period)
             upper = middle + (std * 2)
             lower = middle - (std * 2)
             return {'upper': upper, 'middle': middle, 'lower': lower}
@@ -173,15 +265,14 @@ class IndicatorEngine:
         Returns:
             Formatted string for prompt
         """
-        latest = df.iloc[-1]
         last_n = df.tail(10)
         
-        # Current state
+        # Current state（按列取最新值，避免 iloc[-1] 构造整行Series）
         prompt = f"ALL {coin} DATA\n"
-        prompt += f"current_price = {latest['close']:.2f}, "
-        prompt += f"current_ema20 = {latest['ema_20']:.3f}, "
-        prompt += f"current_macd = {latest['macd']:.3f}, "
-        prompt += f"current_rsi (7 period) = {latest['rsi_7']:.3f}\n\n"
+        prompt += f"current_price = {df['close'].iat[-1]:.2f}, "
+        prompt += f"current_ema20 = {df['ema_20'].iat[-1]:.3f}, "
+        prompt += f"current_macd = {df['macd'].iat[-1]:.3f}, "
+        prompt += f"current_rsi (7 period) = {df['rsi_7'].iat[-1]:.3f}\n\n"
         
         # Intraday series (last 10 candles)
         prompt += "Intraday series (by minute, oldest → latest):\n\n"
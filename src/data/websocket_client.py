@@ -9,6 +9,13 @@ import websockets
 from datetime import datetime
 import pandas as pd
 
+# 可选：orjson（C实现，高频行情帧解析更快）；未安装时回退到标准库json
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,7 +58,7 @@ class BinanceWebSocketClient:
                     try:
                         # 使用更短的超时以便快速响应关闭
                         message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                        data = json.loads(message)
+                        data = json_loads(message)
                         
                         if 'data' in data:
                             stream_data = data['data']
@@ -133,7 +140,7 @@ class BinanceWebSocketClient:
                     try:
                         # 使用更短的超时以便快速响应关闭
                         message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                        data = json.loads(message)
+                        data = json_loads(message)
                         
                         if 'data' in data:
                             ticker = data['data']
@@ -1,6 +1,7 @@
 """Database package for trading bot."""
 
-from .models import TradingDatabase
+from .models import TradingDatabase, PriceTick
+from .writer import DatabaseWriter
 
-__all__ = ['TradingDatabase']
+__all__ = ['TradingDatabase', 'DatabaseWriter', 'PriceTick']
 
@@ -2,10 +2,11 @@
 Trading Database Manager using SQLAlchemy ORM
 支持 SQLite 和 MySQL
 """
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 import logging
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, insert, select
 from sqlalchemy.orm import Session
 
 from .session import DatabaseManager
@@ -17,6 +18,65 @@ from .orm_models import (
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class PriceTick:
+    """单条价格记录（高频路径使用，替代每个tick新建的dict）"""
+    price: float
+    rsi_14: float = 0.0
+    macd: float = 0.0
+    funding_rate: float = 0.0
+    open_interest: float = 0.0
+
+
+def _price_row(symbol: str, price_data: Union[PriceTick, Dict]) -> Dict:
+    """PriceTick 或 dict -> coin_prices 行数据"""
+    if isinstance(price_data, PriceTick):
+        return {
+            'symbol': symbol,
+            'price': price_data.price,
+            'rsi_14': price_data.rsi_14,
+            'macd': price_data.macd,
+            'funding_rate': price_data.funding_rate,
+            'open_interest': price_data.open_interest
+        }
+    return {
+        'symbol': symbol,
+        'price': price_data.get('price', 0),
+        'rsi_14': price_data.get('rsi_14', 0),
+        'macd': price_data.get('macd', 0),
+        'funding_rate': price_data.get('funding_rate', 0),
+        'open_interest': price_data.get('open_interest', 0)
+    }
+
+
+def _ai_decision_row(coin: str, decision: Dict, thinking: str = "") -> Dict:
+    """AI决策 dict -> ai_decisions 行数据（优先取 trade_signal_args 中的字段）"""
+    args = decision.get('trade_signal_args', {})
+    source = args if args else decision
+    return {
+        'coin': coin,
+        'decision': args.get('signal', 'hold') if args else decision.get('decision', 'hold'),
+        'side': decision.get('side', ''),
+        'confidence': source.get('confidence', 0),
+        'leverage': source.get('leverage', 0),
+        'entry_price': source.get('entry_price', 0),
+        'stop_loss': source.get('stop_loss', 0),
+        'take_profit': source.get('take_profit') or source.get('profit_target', 0),
+        'risk_usd': source.get('risk_usd', 0),
+        'reasoning': decision.get('reasoning', ''),
+        'thinking': thinking,
+        'executed': decision.get('executed', False)
+    }
+
+
+def _account_state_row(row) -> Dict:
+    """account_state 查询行 -> 与 AccountState.to_dict() 相同的 dict"""
+    data = dict(row._mapping)
+    timestamp = data['timestamp']
+    data['timestamp'] = timestamp.isoformat() if timestamp else None
+    return data
+
+
 class TradingDatabase:
     """Trading bot数据库管理器 - 使用ORM"""
     
@@ -58,18 +118,11 @@ class TradingDatabase:
         finally:
             session.close()
     
-    def save_coin_price(self, symbol: str, price_data: Dict):
+    def save_coin_price(self, symbol: str, price_data: Union[PriceTick, Dict]):
         """保存币种价格数据"""
         session = self.db_manager.get_session()
         try:
-            coin_price = CoinPrice(
-                symbol=symbol,
-                price=price_data.get('price', 0),
-                rsi_14=price_data.get('rsi_14', 0),
-                macd=price_data.get('macd', 0),
-                funding_rate=price_data.get('funding_rate', 0),
-                open_interest=price_data.get('open_interest', 0)
-            )
+            coin_price = CoinPrice(**_price_row(symbol, price_data))
             session.add(coin_price)
             session.commit()
         except Exception as e:
@@ -79,32 +132,33 @@ class TradingDatabase:
         finally:
             session.close()
     
+    def save_coin_prices_bulk(self, prices: Dict[str, Union[PriceTick, Dict]]):
+        """批量保存币种价格数据（单个事务，executemany）"""
+        if not prices:
+            return
+        
+        rows = [_price_row(symbol, price_data) for symbol, price_data in prices.items()]
+        
+        session = self.db_manager.get_session()
+        try:
+            session.execute(insert(CoinPrice), rows)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving coin prices: {e}")
+            raise
+        finally:
+            session.close()
+    
     def save_ai_decision(self, coin: str, decision: Dict, thinking: str = ""):
         """保存AI决策"""
         if not isinstance(decision, dict):
             logger.warning(f"save_ai_decision: decision for {coin} is not a dict, got {type(decision)}")
             return
         
-        args = decision.get('trade_signal_args', {})
-        
         session = self.db_manager.get_session()
         try:
-            ai_decision = AIDecision(
-                coin=coin,
-                decision=args.get('signal', 'hold') if args else decision.get('decision', 'hold'),
-                side=decision.get('side', ''),
-                confidence=args.get('confidence', 0) if args else decision.get('confidence', 0),
-                leverage=args.get('leverage', 0) if args else decision.get('leverage', 0),
-                entry_price=args.get('entry_price', 0) if args else decision.get('entry_price', 0),
-                stop_loss=args.get('stop_loss', 0) if args else decision.get('stop_loss', 0),
-                take_profit=(args.get('take_profit') or args.get('profit_target', 0)) if args 
-                           else (decision.get('take_profit') or decision.get('profit_target', 0)),
-                risk_usd=args.get('risk_usd', 0) if args else decision.get('risk_usd', 0),
-                reasoning=decision.get('reasoning', ''),
-                thinking=thinking,
-                executed=decision.get('executed', False)
-            )
-            session.add(ai_decision)
+            session.add(AIDecision(**_ai_decision_row(coin, decision, thinking)))
             session.commit()
         except Exception as e:
             session.rollback()
@@ -113,6 +167,28 @@ class TradingDatabase:
         finally:
             session.close()
     
+    def save_ai_decisions_batch(self, decisions: List[Tuple[str, Dict, str]]):
+        """批量保存一轮决策周期的AI决策（单个事务，executemany）"""
+        rows = []
+        for coin, decision, thinking in decisions:
+            if not isinstance(decision, dict):
+                logger.warning(f"save_ai_decisions_batch: decision for {coin} is not a dict, got {type(decision)}")
+                continue
+            rows.append(_ai_decision_row(coin, decision, thinking))
+        if not rows:
+            return
+        
+        session = self.db_manager.get_session()
+        try:
+            session.execute(insert(AIDecision), rows)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving AI decisions: {e}")
+            raise
+        finally:
+            session.close()
+    
     def save_position(self, position: Dict):
         """保存持仓信息"""
         session = self.db_manager.get_session()
@@ -202,37 +278,17 @@ class TradingDatabase:
             # 计算时间范围
             time_threshold = datetime.utcnow() - timedelta(hours=hours)
             
-            if mode == 'full':
-                # 返回全部数据
-                account_states = session.query(AccountState).filter(
-                    AccountState.timestamp >= time_threshold
-                ).order_by(AccountState.timestamp.asc()).all()
-                return [state.to_dict() for state in account_states]
+            table = AccountState.__table__
+            in_range = table.c.timestamp >= time_threshold
+            total_count = session.execute(
+                select(func.count()).select_from(table).where(in_range)
+            ).scalar()
             
-            elif mode == 'fast':
+            if mode == 'fast':
                 # 快速模式：最多200个点
-                total_count = session.query(AccountState).filter(
-                    AccountState.timestamp >= time_threshold
-                ).count()
-                
-                if total_count <= 200:
-                    account_states = session.query(AccountState).filter(
-                        AccountState.timestamp >= time_threshold
-                    ).order_by(AccountState.timestamp.asc()).all()
-                else:
-                    # 采样：每N个取1个
-                    step = max(1, total_count // 200)
-                    account_states = session.query(AccountState).filter(
-                        AccountState.timestamp >= time_threshold
-                    ).order_by(AccountState.timestamp.asc()).all()[::step]
-                    # 确保不超过200个
-                    account_states = account_states[:200]
-                
-                return [state.to_dict() for state in account_states]
-            
-            else:  # mode == 'auto'
+                target_points = 200
+            else:  # mode == 'auto'（full 模式不采样）
                 # 智能采样：根据时间范围动态调整密度
-                target_points = 1000
                 if hours <= 1:
                     target_points = 2000
                 elif hours <= 6:
@@ -241,44 +297,46 @@ class TradingDatabase:
                     target_points = 1000
                 else:
                     target_points = 800
+            
+            if mode == 'full' or total_count <= target_points:
+                # 返回全部数据：只取列元组（不构造ORM对象）
+                sampled = session.execute(
+                    select(table).where(in_range).order_by(table.c.timestamp.asc())
+                ).all()
+            else:
+                # 在数据库内用窗口函数采样（SQLite 3.25+ / MySQL 8），只传回保留的行
+                step = max(1, total_count // target_points)
+                order = (table.c.timestamp.asc(), table.c.id.asc())
+                ranked = select(
+                    table,
+                    func.row_number().over(order_by=order).label('_rn'),
+                    func.lag(table.c.total_value).over(order_by=order).label('_prev'),
+                    func.lead(table.c.total_value).over(order_by=order).label('_next'),
+                ).where(in_range).subquery()
+                rn = ranked.c._rn
                 
-                total_count = session.query(AccountState).filter(
-                    AccountState.timestamp >= time_threshold
-                ).count()
-                
-                if total_count <= target_points:
-                    account_states = session.query(AccountState).filter(
-                        AccountState.timestamp >= time_threshold
-                    ).order_by(AccountState.timestamp.asc()).all()
+                # 每N个取1个
+                keep = (rn - 1) % step == 0
+                if mode == 'fast':
+                    limit = target_points
                 else:
-                    # 采样：每N个取1个，但保留第一个和最后一个
-                    step = max(1, total_count // target_points)
-                    all_states = session.query(AccountState).filter(
-                        AccountState.timestamp >= time_threshold
-                    ).order_by(AccountState.timestamp.asc()).all()
-                    
-                    # 采样并保留转折点
-                    sampled = []
-                    for i, state in enumerate(all_states):
-                        if i == 0 or i == len(all_states) - 1:
-                            # 保留第一个和最后一个
-                            sampled.append(state)
-                        elif i % step == 0:
-                            # 采样点
-                            sampled.append(state)
-                        elif i > 0 and i < len(all_states) - 1:
-                            # 检查是否是转折点
-                            prev_value = all_states[i-1].total_value
-                            next_value = all_states[i+1].total_value
-                            curr_value = state.total_value
-                            
-                            # 如果价值变化方向改变，保留这个点
-                            if abs(curr_value - prev_value) > abs(next_value - curr_value) * 1.5:
-                                sampled.append(state)
-                    
-                    account_states = sampled[:target_points + 100]
+                    # 保留第一个和最后一个，以及价值变化方向改变的转折点
+                    curr = ranked.c.total_value
+                    keep = or_(
+                        keep,
+                        rn == total_count,
+                        func.abs(curr - ranked.c._prev) > func.abs(ranked.c._next - curr) * 1.5
+                    )
+                    limit = target_points + 100
                 
-                return [state.to_dict() for state in account_states]
+                sampled = session.execute(
+                    select(*(ranked.c[column.name] for column in table.columns))
+                    .where(keep)
+                    .order_by(rn)
+                    .limit(limit)
+                ).all()
+            
+            return [_account_state_row(row) for row in sampled]
         finally:
             session.close()
     
@@ -298,6 +356,45 @@ class TradingDatabase:
         finally:
             session.close()
     
+    @staticmethod
+    def _history_version(session: Session, column, *conditions) -> Optional[str]:
+        """
+        历史数据版本：窗口内最新时间戳 + 行数（只追加写入，二者不变即窗口内容不变）。
+        用于HTTP ETag，无数据时返回 None。
+        """
+        latest, count = session.execute(
+            select(func.max(column), func.count()).where(*conditions)
+        ).one()
+        if latest is None:
+            return None
+        return f"{latest.isoformat()}|{count}"
+    
+    def get_account_history_version(self, hours: int = 24, since_timestamp: Optional[str] = None) -> Optional[str]:
+        """账户历史窗口的数据版本（参数与 get_account_history / get_account_history_since 对应）"""
+        session = self.db_manager.get_session()
+        try:
+            if since_timestamp:
+                if isinstance(since_timestamp, str):
+                    since_timestamp = datetime.fromisoformat(since_timestamp.replace('Z', '+00:00'))
+                condition = AccountState.timestamp > since_timestamp
+            else:
+                condition = AccountState.timestamp >= datetime.utcnow() - timedelta(hours=hours)
+            return self._history_version(session, AccountState.timestamp, condition)
+        finally:
+            session.close()
+    
+    def get_price_history_version(self, symbol: str, hours: int = 24) -> Optional[str]:
+        """价格历史窗口的数据版本"""
+        session = self.db_manager.get_session()
+        try:
+            time_threshold = datetime.utcnow() - timedelta(hours=hours)
+            return self._history_version(
+                session, CoinPrice.timestamp,
+                CoinPrice.symbol == symbol, CoinPrice.timestamp >= time_threshold
+            )
+        finally:
+            session.close()
+    
     def get_price_history(self, symbol: str, hours: int = 24) -> List[Dict]:
         """获取价格历史"""
         session = self.db_manager.get_session()
@@ -401,13 +498,23 @@ class TradingDatabase:
         finally:
             session.close()
     
-    def get_trade_history_paginated(self, offset: int, limit: int) -> List[Dict]:
-        """获取交易历史（分页）"""
+    def get_trade_history_paginated(self, cursor: Optional[int], limit: int) -> List[Dict]:
+        """
+        获取交易历史（游标分页，按 id 倒序）
+        
+        交易在平仓时写入，id 顺序即 close_timestamp 顺序；用主键 id < cursor 定位，
+        避免 OFFSET 逐行扫描丢弃前面的记录。
+        
+        Args:
+            cursor: 上一页最后一条记录的 id（None 表示第一页）
+            limit: 每页条数
+        """
         session = self.db_manager.get_session()
         try:
-            trades = session.query(TradeHistory).order_by(
-                TradeHistory.close_timestamp.desc()
-            ).offset(offset).limit(limit).all()
+            query = session.query(TradeHistory)
+            if cursor is not None:
+                query = query.filter(TradeHistory.id < cursor)
+            trades = query.order_by(TradeHistory.id.desc()).limit(limit).all()
             return [t.to_dict() for t in trades]
         finally:
             session.close()
@@ -427,7 +534,8 @@ class TradingDatabase:
             # 先清空旧的活跃持仓记录
             session.query(Position).filter(Position.active == True).delete()
             
-            # 保存当前持仓
+            # 保存当前持仓（收集后一次性批量插入）
+            rows = []
             for pos in positions:
                 contracts = pos.get('contracts', 0)
                 if not contracts or contracts == 0:
@@ -443,20 +551,21 @@ class TradingDatabase:
                 else:
                     unrealized_pnl = contracts * (entry_price - current_price)
                 
-                db_position = Position(
-                    symbol=symbol,
-                    side=side,
-                    quantity=contracts,
-                    entry_price=entry_price,
-                    current_price=current_price,
-                    leverage=pos.get('leverage', 1),
-                    unrealized_pnl=unrealized_pnl,
-                    stop_loss=0,
-                    take_profit=0,
-                    active=True
-                )
-                session.add(db_position)
+                rows.append({
+                    'symbol': symbol,
+                    'side': side,
+                    'quantity': contracts,
+                    'entry_price': entry_price,
+                    'current_price': current_price,
+                    'leverage': pos.get('leverage', 1),
+                    'unrealized_pnl': unrealized_pnl,
+                    'stop_loss': 0,
+                    'take_profit': 0,
+                    'active': True
+                })
             
+            if rows:
+                session.execute(insert(Position), rows)
             session.commit()
         except Exception as e:
             session.rollback()
@@ -1,16 +1,49 @@
 """
 Database session management using SQLAlchemy
 """
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import logging
+import ssl
 from typing import Optional
 
 from .orm_models import Base
 
 logger = logging.getLogger(__name__)
 
+# SQLite 连接参数：WAL 允许Web服务读取与交易机器人写入并发（两者通常是不同进程），
+# WAL 下 synchronous=NORMAL 仍保证数据库一致性，只减少每次提交的 fsync
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",  # 页缓存约64MB（负数单位为KiB），仪表盘的历史查询可命中缓存
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """新建 SQLite 连接时设置 PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _mysql_ssl_context(ssl_ca: Optional[str] = None) -> ssl.SSLContext:
+    """
+    构建一次 MySQL SSL 上下文供连接池所有连接复用（pymysql 收到 dict 时每次建连都会重新加载CA证书）。
+    与 pymysql 对 {"ca": ssl_ca, "check_hostname": False} 的处理一致：不校验主机名，
+    指定CA时校验服务器证书，否则使用系统CA且不校验证书。
+    """
+    context = ssl.create_default_context(cafile=ssl_ca)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_REQUIRED if ssl_ca else ssl.CERT_NONE
+    return context
+
 
 def create_database_url(db_type: str, **kwargs) -> str:
     """
@@ -70,6 +103,7 @@ class DatabaseManager:
                 poolclass=StaticPool,
                 echo=False
             )
+            event.listen(self.engine, "connect", _apply_sqlite_pragmas)
         else:  # MySQL
             # Prepare SSL connection arguments for pymysql
             connect_args = {}
@@ -79,23 +113,9 @@ class DatabaseManager:
             ssl_ca = kwargs.get("ssl_ca")
             
             if ssl_mode != "DISABLED":
-                # Enable SSL for pymysql
-                # pymysql expects ssl dictionary with specific keys
-                ssl_config = {}
-                
-                if ssl_ca:
-                    # Use custom CA certificate
-                    ssl_config["ca"] = ssl_ca
-                    ssl_config["check_hostname"] = False
-                else:
-                    # Use system default CA certificates
-                    # For TiDB Cloud and most cloud MySQL providers
-                    # An empty dict or {'check_hostname': False} enables SSL with system CA
-                    ssl_config["check_hostname"] = False
-                
-                # Only set ssl if we have a valid config
-                if ssl_config:
-                    connect_args["ssl"] = ssl_config
+                # Enable SSL for pymysql (custom CA certificate, or system default CA
+                # for TiDB Cloud and most cloud MySQL providers)
+                connect_args["ssl"] = _mysql_ssl_context(ssl_ca)
                     
             self.engine = create_engine(
                 self.db_url,
@@ -0,0 +1,145 @@
+"""
+Background database writer
+在独立线程中顺序执行写库操作，避免同步ORM写入阻塞asyncio事件循环
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Union
+
+from .models import PriceTick
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# 队列积压时可以丢弃的写操作：价格每秒都会重新写入，丢失一条无影响；
+# 交易、决策、账户、持仓和配置不可丢失，始终入队
+_DROPPABLE_METHODS = frozenset({'save_coin_price', 'save_coin_prices_bulk'})
+
+
+class DatabaseWriter:
+    """单线程写库队列 - 调用方立即返回，由后台线程按提交顺序写入"""
+    
+    def __init__(self, db, max_batch: int = 64, max_queue: int = 10000):
+        """
+        Args:
+            db: TradingDatabase 实例
+            max_batch: 每次从队列取出的最大操作数
+            max_queue: 价格写入的积压上限（写库跟不上时丢弃新的价格写入，避免内存无限增长）
+        """
+        self.db = db
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        # 队列本身不设上限，put 不会阻塞事件循环；积压上限只作用于可丢弃的价格写入
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """启动后台写线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 10.0):
+        """写完队列中剩余的操作后停止线程（阻塞调用，协程中请配合 asyncio.to_thread 使用）"""
+        if not self._thread or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"⚠️ DB writer did not finish within {timeout:.0f}s ({self._queue.qsize()} pending)")
+    
+    def submit(self, method: str, *args, **kwargs):
+        """提交一次写操作（method 为 TradingDatabase 的方法名）"""
+        if method in _DROPPABLE_METHODS and self._queue.qsize() >= self.max_queue:
+            logger.warning(f"⚠️ DB write queue full, dropping {method}")
+            return
+        self._queue.put_nowait((method, args, kwargs, None))
+    
+    def call(self, method: str, *args, **kwargs) -> Future:
+        """在写线程上执行并返回 Future（与写操作串行，协程中可用 asyncio.wrap_future 等待）"""
+        future: Future = Future()
+        if not self._thread or not self._thread.is_alive():
+            self._execute(method, args, kwargs, future)
+            return future
+        self._queue.put((method, args, kwargs, future))
+        return future
+    
+    def get_config(self, key: str) -> Optional[str]:
+        """阻塞等待写线程返回（协程中请使用 call('get_config', key) 配合 asyncio.wrap_future）"""
+        return self.call('get_config', key).result()
+    
+    def set_config(self, key: str, value: str):
+        self.submit('set_config', key, value)
+    
+    # 与 TradingDatabase 同名的写方法，可直接替代 db 传给其他组件
+    def save_coin_price(self, symbol: str, price_data: Union[PriceTick, Dict]):
+        self.submit('save_coin_price', symbol, price_data)
+    
+    def save_coin_prices_bulk(self, prices: Dict[str, Union[PriceTick, Dict]]):
+        self.submit('save_coin_prices_bulk', prices)
+    
+    def save_account_state(self, state: Dict):
+        self.submit('save_account_state', state)
+    
+    def save_ai_decision(self, coin: str, decision: Dict, thinking: str = ""):
+        self.submit('save_ai_decision', coin, decision, thinking)
+    
+    def save_ai_decisions_batch(self, decisions):
+        self.submit('save_ai_decisions_batch', decisions)
+    
+    def save_trade(self, trade: Dict):
+        self.submit('save_trade', trade)
+    
+    def save_positions(self, positions, realtime_prices):
+        self.submit('_save_positions_to_db', positions, realtime_prices)
+    
+    def _run(self):
+        """后台线程：批量取出操作，连续的单条价格写入合并为一次批量写入"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = False
+            prices: Dict[str, Union[PriceTick, Dict]] = {}
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                method, args, kwargs, future = item
+                if method == 'save_coin_price' and not kwargs and future is None:
+                    # 同一币种重复出现时先落库，保证每条记录都写入
+                    if args[0] in prices:
+                        self._execute('save_coin_prices_bulk', (prices,), {})
+                        prices = {}
+                    prices[args[0]] = args[1]
+                    continue
+                if prices:
+                    self._execute('save_coin_prices_bulk', (prices,), {})
+                    prices = {}
+                self._execute(method, args, kwargs, future)
+            if prices:
+                self._execute('save_coin_prices_bulk', (prices,), {})
+            
+            if stop:
+                return
+    
+    def _execute(self, method: str, args: tuple, kwargs: dict, future: Optional[Future] = None):
+        try:
+            result = getattr(self.db, method)(*args, **kwargs)
+        except Exception as e:
+            if future is not None:
+                future.set_exception(e)
+                return
+            # 具体错误已由 TradingDatabase 记录，这里只记录失败的操作
+            logger.error(f"DB writer: {method} failed: {e}")
+        else:
+            if future is not None:
+                future.set_result(result)
@@ -0,0 +1,18 @@
+"""Event loop selection shared by the bot (main.py) and the web server (web_server.py)."""
+
+import asyncio
+import sys
+
+from .config import settings
+
+
+def install_event_loop_policy() -> bool:
+    """使用 uvloop 事件循环（可选依赖，USE_UVLOOP=false、未安装或Windows下使用默认循环）"""
+    if not settings.use_uvloop or sys.platform == 'win32':
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
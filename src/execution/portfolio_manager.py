@@ -20,6 +20,21 @@ class PortfolioManager:
         self._initial_balance_set = (initial_balance is not None)
         self._last_total_value = initial_balance or 0  # Cache last calculated total value
         self._db = db  # Database reference for persisting initial_balance
+        self._saved_initial_checked = False  # restore_initial_balance() 已查询过数据库
+    
+    def restore_initial_balance(self, saved_initial: Optional[str]):
+        """
+        传入数据库中保存的初始余额（调用方在启动时异步读取），
+        之后 calculate_account_state 不再在事件循环中同步查询数据库。
+        
+        Args:
+            saved_initial: config 表中的 initial_balance（未保存时为 None）
+        """
+        self._saved_initial_checked = True
+        if saved_initial and not self._initial_balance_set:
+            self.initial_balance = float(saved_initial)
+            self._initial_balance_set = True
+            logger.info(f"📊 Loaded initial balance from DB: ${self.initial_balance:.2f} USDT")
     
     def calculate_account_state(
         self,
@@ -85,7 +100,8 @@ class PortfolioManager:
         if not self._initial_balance_set:
             # Try to load from database first
             if self._db:
-                saved_initial = self._db.get_config('initial_balance')
+                # 已由 restore_initial_balance() 确认数据库中没有保存值时跳过查询
+                saved_initial = None if self._saved_initial_checked else self._db.get_config('initial_balance')
                 if saved_initial:
                     self.initial_balance = float(saved_initial)
                     logger.info(f"📊 Loaded initial balance from DB: ${self.initial_balance:.2f} USDT")
@@ -2,8 +2,15 @@
 
 import asyncio
 import logging
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
 
 from .config import settings, trading_config
 from .data.exchange_client import ExchangeClient
@@ -15,10 +22,13 @@ from .ai.decision_validator import DecisionValidator
 from .execution.order_manager import OrderManager
 from .execution.portfolio_manager import PortfolioManager
 from .execution.paper_trading import PaperTradingEngine
-from .database import TradingDatabase
+from .database import TradingDatabase, DatabaseWriter, PriceTick
 
 logger = logging.getLogger(__name__)
 
+# 持仓数据校验的关键字段（有持仓时不能为 None）
+POSITION_CRITICAL_FIELDS = ('entryPrice', 'markPrice', 'unrealizedPnl')
+
 
 class TradingBot:
     """
@@ -85,7 +95,11 @@ class TradingBot:
         self.db = TradingDatabase(db_type=resolved_db_type, **resolved_db_kwargs)
         logger.info(f"Database initialized ({resolved_db_type.upper()}) for monitoring")
         
-        self.order_manager = OrderManager(self.exchange, db=self.db)
+        # 写库统一交给后台线程执行，避免同步ORM写入阻塞事件循环
+        self.db_writer = DatabaseWriter(self.db)
+        self.db_writer.start()
+        
+        self.order_manager = OrderManager(self.exchange, db=self.db_writer)
         
         # Get initial balance
         # For paper trading: use config file
@@ -96,19 +110,78 @@ class TradingBot:
             # For live/testnet, will be initialized from real account balance
             initial_balance = None  # Will be set on first fetch
         
-        self.portfolio = PortfolioManager(initial_balance=initial_balance, db=self.db)
+        self.portfolio = PortfolioManager(initial_balance=initial_balance, db=self.db_writer)
         
         # Initialize WebSocket client for real-time data
         self.ws_client = BinanceWebSocketClient()
         logger.info("WebSocket client initialized for real-time data")
         
+        # 预计算币种/交易对映射，避免每个tick做字符串拼接和替换
+        # coin: 'BTC'  symbol: 'BTC/USDT:USDT'  ws_symbol: 'BTCUSDT'
+        self._pairs: Tuple[str, ...] = tuple(trading_config.trading_pairs)
+        self._coins: Tuple[str, ...] = tuple(pair.split('/')[0] for pair in self._pairs)
+        coins = self._coins
+        self._symbol_of_coin: Dict[str, str] = {coin: f"{coin}/USDT:USDT" for coin in coins}
+        self._ws_symbol_of_coin: Dict[str, str] = {coin: f"{coin}USDT" for coin in coins}
+        # ws_symbol -> (coin, symbol)，ticker路径只做一次字典查找
+        self._symbol_table: Dict[str, Tuple[str, str]] = {
+            f"{coin}USDT": (coin, f"{coin}/USDT:USDT") for coin in coins
+        }
+        
+        # 入场执行保护参数（配置在运行期间不变，只解析一次）
+        exec_protection = trading_config.risk_params.get('execution_protection', {})
+        self._max_slippage_warning = exec_protection.get('max_slippage_percent', 10.0)  # 提升到10%仅做警告
+        self._slippage_log_threshold = exec_protection.get('log_slippage_threshold_percent', 0.1)
+        self._revalidate_rr = exec_protection.get('revalidate_rr_ratio', True)
+        self._min_rr = trading_config.risk_params.get('exit_strategy', {}).get('min_risk_reward_ratio', 1.0)
+        
         # 缓存最新的市场数据（从WebSocket更新）
         self.latest_prices = {}
         self.latest_klines = {}
         
+        # 待写库的ticker（事件驱动写库，按窗口合并）：每个tick只记录symbol，不入队
+        self._dirty_symbols: set = set()
+        self._price_dirty_event = asyncio.Event()
+        # 最近一次写库的价格（coin -> price），价格未变化时跳过写入
+        self._last_written_price: Dict[str, float] = {}
+        self.price_change_tolerance = 1e-6  # 相对变化小于该阈值视为未变化
+        
+        # 停止事件：running 置为 False 时触发，用于替代轮询式检查
+        self._stop_event = asyncio.Event()
         self.running = False
         self.decision_interval = trading_config.decision_interval_minutes * 60  # Convert to seconds
-        self.price_update_interval = 3  # 价格更新间隔（秒）- 高频更新
+        self.price_update_interval = 3  # 账户状态更新间隔（秒）- 高频更新
+        self.price_flush_window = 1.0  # 价格合并写入窗口（秒）
+        
+        # 所有交易所REST调用共享的并发上限，避免突发请求触发限频
+        self.exchange_concurrency = 4
+        self._exchange_sem = asyncio.Semaphore(self.exchange_concurrency)
+        
+        # 持仓接口熔断：连续失败达到阈值后在冷却期内直接返回空持仓，避免连续请求触发418封禁
+        self.positions_cb_threshold = 5
+        self.positions_cb_cooldown = 30.0
+        self._positions_fail_count = 0
+        self._positions_cb_until = 0.0
+        
+        # 最近一次完整的账户快照 (balance, positions, 请求发起的monotonic时间)，由3秒账户循环刷新
+        self._account_snapshot: Optional[Tuple[Dict, List[Dict], float]] = None
+        self.account_snapshot_max_age = 5.0
+        # 每批决策执行完成的时间：在此之前发起的账户请求可能不包含刚成交的订单，不能作为快照
+        self._account_snapshot_floor = 0.0
+        
+        # 决策队列：执行循环负责下单，交易循环在等待间隔期间不被阻塞。
+        # 下一轮迭代先等待上一批执行完成（queue.join）再读取账户和持仓，保证提示词和校验基于已成交的状态
+        # 元素为 (decisions, positions, current_prices, thinking, position_map)
+        self._decision_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        
+        # 指标计算进程池（首次使用时创建），避免pandas计算阻塞事件循环
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._cpu_workers = min(4, max(1, len(self._pairs)))
+        
+        # K线缓存（(pair, timeframe) -> 最近 limit 根K线），已收盘K线不变，每轮只增量拉取最新几根
+        self._ohlcv_cache: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self.ohlcv_refresh_bars = 5
+        self.indicator_pool_enabled = True
     
     async def start(self, shutdown_event: Optional[asyncio.Event] = None):
         """
@@ -124,99 +197,52 @@ class TradingBot:
         self.running = True
         self.shutdown_event = shutdown_event
         
-        # Start monitoring shutdown event if provided
-        if shutdown_event:
-            monitor_task = asyncio.create_task(self._monitor_shutdown_event())
-        
-        # 启动WebSocket数据流（不阻塞）
-        symbols = [pair.split('/')[0] + 'USDT' for pair in trading_config.trading_pairs]
-        logger.info(f"Starting WebSocket for {len(symbols)} symbols...")
-        ws_task = asyncio.create_task(self.start_websocket_streams(symbols))
-        
-        # 等待WebSocket连接建立
-        await asyncio.sleep(3)
-        logger.info("✅ WebSocket streams started")
+        # 在首次REST请求前创建共享HTTP连接池
+        self.data_client.open()
+        if self.exchange is not self.data_client and hasattr(self.exchange, 'open'):
+            self.exchange.open()
         
-        # 创建主循环任务
-        price_update_task = asyncio.create_task(self.run_price_update_loop())
-        trading_loop_task = asyncio.create_task(self.run_trading_loop())
+        # Python 3.12+：同步完成的协程无需经过事件循环调度
+        if hasattr(asyncio, 'eager_task_factory'):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
         
+        # 结构化并发：任一任务异常时 TaskGroup 自动取消其余任务，并以 ExceptionGroup 抛出
         try:
-            # 等待所有任务完成（或直到 self.running 变为 False）
-            tasks = [price_update_task, trading_loop_task, ws_task]
-            if shutdown_event:
-                tasks.append(monitor_task)
-            
-            # 使用 asyncio.wait 等待任务，同时检查 running 标志和 shutdown_event
-            while self.running:
-                # 检查 shutdown_event 是否被设置（快速响应）
-                if shutdown_event and shutdown_event.is_set():
-                    logger.info("🛑 Shutdown event detected, stopping all tasks...")
-                    self.running = False
-                    break
+            async with asyncio.TaskGroup() as tg:
+                loop_tasks: List[asyncio.Task] = []
                 
-                done, pending = await asyncio.wait(
-                    tasks,
-                    timeout=0.5,  # 更频繁检查
-                    return_when=asyncio.FIRST_COMPLETED
-                )
+                # Start monitoring shutdown event if provided
+                if shutdown_event:
+                    loop_tasks.append(tg.create_task(self._monitor_shutdown_event(), name='shutdown-monitor'))
                 
-                # 再次检查 shutdown_event（可能在等待期间被设置）
-                if shutdown_event and shutdown_event.is_set():
-                    logger.info("🛑 Shutdown event detected during wait, stopping all tasks...")
-                    self.running = False
-                    break
+                # 启动WebSocket数据流（不阻塞）
+                symbols = list(self._symbol_table)
+                logger.info(f"Starting WebSocket for {len(symbols)} symbols...")
+                ws_task = tg.create_task(self.start_websocket_streams(symbols), name='websocket-streams')
+                ws_task.add_done_callback(self._on_ws_task_done)
+                loop_tasks.append(ws_task)
                 
-                # 如果收到停止信号，取消所有任务
-                if not self.running:
-                    logger.info("🛑 Stopping all tasks...")
-                    for task in pending:
-                        if not task.done():
-                            task.cancel()
-                    break
+                # 等待WebSocket连接建立，同时预热市场信息和账户状态（缩短首轮迭代耗时）
+                await asyncio.gather(asyncio.sleep(3), self._prewarm())
+                logger.info("✅ WebSocket streams started")
                 
-                # 检查是否有任务异常
-                for task in done:
-                    if task.exception():
-                        raise task.exception()
-            
-            # 取消所有任务
-            logger.info("🛑 Cancelling all tasks...")
-            for task in tasks:
-                if not task.done():
-                    task.cancel()
-            
-            # 等待所有任务完成或取消
-            logger.info("⏳ Waiting for tasks to complete...")
-            await asyncio.gather(*tasks, return_exceptions=True)
+                # 创建主循环任务
+                loop_tasks.append(tg.create_task(self.run_price_writer_loop(), name='price-writer'))
+                loop_tasks.append(tg.create_task(self.run_price_update_loop(), name='price-update'))
+                loop_tasks.append(tg.create_task(self.run_trading_loop(), name='trading-loop'))
+                loop_tasks.append(tg.create_task(self.run_execution_loop(), name='trade-executor'))
+                
+                # 停止信号（running 置为 False，shutdown_event 由 monitor 转换）到达时取消所有任务
+                tg.create_task(self._cancel_on_stop(loop_tasks), name='stop-waiter')
             
+        except ExceptionGroup as eg:
+            for exc in eg.exceptions:
+                logger.error(f"❌ Fatal error in trading loop: {exc}", exc_info=exc)
+            raise eg.exceptions[0]
         except KeyboardInterrupt:
             logger.info("⚠️  Keyboard interrupt received in start()")
-            self.running = False
-            # 取消所有任务
-            all_tasks = [price_update_task, trading_loop_task, ws_task]
-            if shutdown_event:
-                all_tasks.append(monitor_task)
-            for task in all_tasks:
-                if not task.done():
-                    task.cancel()
-            # 等待任务取消完成
-            await asyncio.gather(*all_tasks, return_exceptions=True)
         except asyncio.CancelledError:
             logger.info("⚠️  Tasks cancelled in start()")
-            self.running = False
-        except Exception as e:
-            logger.error(f"❌ Fatal error in trading loop: {e}", exc_info=True)
-            self.running = False
-            # 取消所有任务
-            all_tasks = [price_update_task, trading_loop_task, ws_task]
-            if shutdown_event:
-                all_tasks.append(monitor_task)
-            for task in all_tasks:
-                if not task.done():
-                    task.cancel()
-            await asyncio.gather(*all_tasks, return_exceptions=True)
-            raise
         finally:
             # 确保所有任务都停止
             self.running = False
@@ -224,6 +250,54 @@ class TradingBot:
             # 调用 shutdown 确保清理
             await self.shutdown()
     
+    async def _cancel_on_stop(self, tasks: List[asyncio.Task]):
+        """等待停止信号后取消所有循环任务，TaskGroup 随即正常退出"""
+        await self._stop_event.wait()
+        if self.shutdown_event and self.shutdown_event.is_set():
+            logger.info("🛑 Shutdown event detected, stopping all tasks...")
+        else:
+            logger.info("🛑 Stopping all tasks...")
+        for task in tasks:
+            task.cancel()
+    
+    async def _prewarm(self):
+        """启动预热：加载交易所市场信息、刷新一次账户状态（失败不影响启动）"""
+        # 先在写线程上读取已保存的初始余额，计算账户状态时不再同步查库
+        await self._restore_initial_balance()
+        results = await asyncio.gather(
+            self._exchange_call(self.data_client.load_markets),
+            self._update_account_state(),
+            self._warm_cpu_pool(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Prewarm step failed: {result}")
+    
+    async def _restore_initial_balance(self):
+        """读取数据库中保存的初始余额并交给 PortfolioManager（Paper模式已有配置的初始余额）"""
+        if self.portfolio.initial_balance is not None:
+            return
+        try:
+            saved_initial = await asyncio.wrap_future(self.db_writer.call('get_config', 'initial_balance'))
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load initial balance from DB: {e}")
+            return
+        self.portfolio.restore_initial_balance(saved_initial)
+    
+    def _on_ws_task_done(self, task: asyncio.Task):
+        """WebSocket任务结束回调：数据流中断时停止机器人，避免基于过期价格继续运行"""
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.error(f"❌ WebSocket streams crashed: {exc}", exc_info=exc)
+        elif self.running:
+            logger.error("❌ WebSocket streams exited unexpectedly")
+        else:
+            return
+        self.running = False
+    
     async def start_websocket_streams(self, symbols: List[str]):
         """启动WebSocket数据流"""
         async def on_kline(symbol: str, kline_data: Dict):
@@ -234,7 +308,13 @@ class TradingBot:
         async def on_ticker(symbol: str, ticker_data: Dict):
             """Ticker数据回调"""
             # 只存储价格值，不存储整个字典
-            self.latest_prices[symbol] = float(ticker_data.get('price', ticker_data.get('last', 0)))
+            if symbol not in self._symbol_table:
+                return
+            price = float(ticker_data.get('price', ticker_data.get('last', 0)))
+            self.latest_prices[symbol] = price
+            # 标记待写库，由 run_price_writer_loop 合并后批量写入
+            self._dirty_symbols.add(symbol)
+            self._price_dirty_event.set()
         
         try:
             # 启动K线和Ticker流（并行）
@@ -246,15 +326,42 @@ class TradingBot:
             logger.info("🛑 WebSocket streams cancelled")
             raise
     
+    async def run_price_writer_loop(self):
+        """事件驱动的价格写入循环 - 合并窗口内的ticker更新后批量写入数据库（供前端显示）"""
+        logger.info(f"🔄 Price writer loop started (coalescing {self.price_flush_window:.0f}s windows)")
+        
+        try:
+            while self.running:
+                # 等待第一条更新（行情安静时不写库）
+                await self._price_dirty_event.wait()
+                
+                # 窗口内的ticker只更新 latest_prices，窗口结束后每个symbol取最新价格写一次
+                await asyncio.sleep(self.price_flush_window)
+                self._price_dirty_event.clear()
+                dirty, self._dirty_symbols = self._dirty_symbols, set()
+                latest_prices = self.latest_prices
+                pending = {symbol: latest_prices[symbol] for symbol in dirty}
+                
+                await self._update_price_data(pending)
+        except asyncio.CancelledError:
+            logger.info("🛑 Price writer loop cancelled")
+            raise
+    
     async def run_price_update_loop(self):
-        """高频价格更新循环 - 每3秒更新一次数据库（供前端显示）"""
-        logger.info("🔄 Price update loop started (every 3s)")
+        """高频账户更新循环 - 每3秒更新账户状态并检查订单（供前端显示）"""
+        logger.info("🔄 Account update loop started (every 3s)")
         
         try:
             while self.running:
-                await self._update_price_data()
-                await self._update_account_state()
-                await self._check_completed_orders()
+                # 账户刷新与订单检查互不依赖，并发执行（价格写库已由 run_price_writer_loop 事件驱动）
+                results = await asyncio.gather(
+                    self._update_account_state(),
+                    self._check_completed_orders(),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.warning(f"Account update step failed: {result}")
                 
                 if not self.running:
                     break
@@ -264,39 +371,59 @@ class TradingBot:
             logger.info("🛑 Price update loop cancelled")
             raise
     
-    async def _update_price_data(self):
+    async def _update_price_data(self, latest_prices: Dict[str, float]):
         """更新价格数据到数据库（解耦）"""
-        if not self.latest_prices:
+        if not latest_prices:
             return
         
-        for symbol, price in self.latest_prices.items():
-            coin = symbol.replace('USDT', '').replace('usdt', '')
-            price_data = {
-                'price': float(price),
-                'rsi_14': 0,
-                'macd': 0,
-                'funding_rate': 0,
-                'open_interest': 0
-            }
-            self.db.save_coin_price(coin, price_data)
+        symbol_table = self._symbol_table
+        prices = {}
+        for symbol, price in latest_prices.items():
+            entry = symbol_table.get(symbol)
+            if entry is None:
+                continue
+            coin = entry[0]
+            price = float(price)
+            if not self._price_changed(coin, price):
+                continue
+            prices[coin] = PriceTick(price=price)
+        
+        if not prices:
+            return
+        
+        # 单个事务批量写入（N次提交 → 1次提交），由后台写线程执行
+        self.db_writer.save_coin_prices_bulk(prices)
+        
+        for coin, tick in prices.items():
+            self._last_written_price[coin] = tick.price
+    
+    def _price_changed(self, coin: str, price: float) -> bool:
+        """判断价格相对上次写库是否有变化（忽略浮点噪声）"""
+        last = self._last_written_price.get(coin)
+        if not last:
+            return True
+        return abs(price - last) / last >= self.price_change_tolerance
     
     async def _update_account_state(self):
         """更新账户状态（解耦，独立错误处理）"""
         try:
-            balance = await self.exchange.fetch_balance()
-            positions = await self.exchange.fetch_positions()
+            started = time.monotonic()
+            balance, positions = await asyncio.gather(
+                self._exchange_call(self.exchange.fetch_balance),
+                self._exchange_call(self.exchange.fetch_positions)
+            )
             
-            realtime_prices = {}
-            for symbol, price in self.latest_prices.items():
-                if symbol.endswith('USDT'):
-                    base = symbol[:-4]
-                    realtime_prices[f"{base}/USDT:USDT"] = price
+            realtime_prices = self._convert_to_realtime_prices()
             
             account_state = self.portfolio.calculate_account_state(
                 balance, positions, realtime_prices=realtime_prices
             )
-            self.db.save_account_state(account_state)
-            self.db._save_positions_to_db(positions, realtime_prices)
+            self.db_writer.save_account_state(account_state)
+            self.db_writer.save_positions(positions, realtime_prices)
+            
+            # 持仓数据完整、且请求发起于最近一批决策执行完成之后时记录快照，供交易迭代复用
+            if started >= self._account_snapshot_floor and not self._invalid_position_symbols(positions):
+                self._account_snapshot = (balance, positions, started)
         except Exception as e:
             if "rate limit" in str(e).lower() or "timeout" in str(e).lower():
                 logger.warning(f"Account state update issue: {e}")
@@ -315,15 +442,27 @@ class TradingBot:
         except Exception:
             pass
     
+    @property
+    def running(self) -> bool:
+        return self._running
+    
+    @running.setter
+    def running(self, value: bool):
+        """设置运行状态，置为 False 时唤醒所有等待停止事件的协程"""
+        self._running = value
+        if value:
+            self._stop_event.clear()
+        else:
+            self._stop_event.set()
+    
     async def _sleep_with_check(self, seconds: float):
-        """带 running 检查的 sleep（解耦）"""
-        elapsed = 0
-        check_interval = 0.1  # 每100ms检查一次
-        while elapsed < seconds and self.running:
-            await asyncio.sleep(min(check_interval, seconds - elapsed))
-            elapsed += check_interval
-            if not self.running:
-                break
+        """可被停止信号立即打断的 sleep（解耦）"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
     
     async def fetch_positions_with_retry(self, max_retries=2):
         """
@@ -336,40 +475,38 @@ class TradingBot:
         Returns:
             List of positions
         """
+        if time.monotonic() < self._positions_cb_until:
+            remaining = self._positions_cb_until - time.monotonic()
+            logger.warning(f"⛔ Position circuit breaker open, skipping fetch ({remaining:.0f}s left)")
+            return []
+        
         for attempt in range(max_retries + 1):
             if not self.running:
                 return []
                 
             try:
-                positions = await self.exchange.fetch_positions()
+                positions = await self._exchange_call(self.exchange.fetch_positions)
                 
-                # Validate data quality
-                has_invalid_data = False
-                for pos in positions:
-                    # Check for None values in critical fields (only if position exists)
-                    contracts = pos.get('contracts', 0)
-                    if contracts and contracts != 0:
-                        critical_fields = ['entryPrice', 'markPrice', 'unrealizedPnl']
-                        for field in critical_fields:
-                            if pos.get(field) is None:
-                                has_invalid_data = True
-                                logger.warning(f"Invalid data in position {pos.get('symbol')}: {field} is None")
-                                break
-                    if has_invalid_data:
-                        break
+                # Validate data quality: critical fields of open positions must not be None
+                invalid = self._invalid_position_symbols(positions)
+                if invalid:
+                    logger.warning(f"Invalid data in positions {invalid}: missing {'/'.join(POSITION_CRITICAL_FIELDS)}")
+                    if self._record_positions_failure():
+                        return []
                 
                 # If data is valid, return it
-                if not has_invalid_data:
+                if not invalid:
+                    self._positions_fail_count = 0
                     if attempt > 0:
                         logger.info(f"✅ Successfully fetched valid position data on attempt {attempt + 1}")
                     return positions
                 
                 # If invalid, retry with exponential backoff
                 if attempt < max_retries:
-                    # Exponential backoff: 5s, 10s, 20s
-                    wait_time = 5 * (2 ** attempt)
+                    # Exponential backoff with jitter: 5-15s, 10-30s, 20-60s
+                    wait_time = self._backoff_delay(5 * (2 ** attempt))
                     logger.warning(
-                        f"⚠️ Invalid data detected. Retrying in {wait_time}s "
+                        f"⚠️ Invalid data detected. Retrying in {wait_time:.1f}s "
                         f"(attempt {attempt + 2}/{max_retries + 1})... "
                         f"[Exponential backoff to avoid rate limit]"
                     )
@@ -379,19 +516,23 @@ class TradingBot:
                 if not self.running:
                     return []
                     
+                if self._record_positions_failure():
+                    return []
+                
                 error_msg = str(e)
                 # Check if it's a rate limit error
                 is_rate_limit = '418' in error_msg or 'rate limit' in error_msg.lower()
                 
                 if is_rate_limit:
-                    logger.error(f"🚫 Rate limit hit! Waiting 60s before retry...")
+                    wait_time = self._backoff_delay(60, spread=1.5)
+                    logger.error(f"🚫 Rate limit hit! Waiting {wait_time:.0f}s before retry...")
                     if attempt < max_retries:
-                        await self._sleep_with_check(60)  # 使用可中断的 sleep
+                        await self._sleep_with_check(wait_time)  # 使用可中断的 sleep
                 else:
                     logger.error(f"Error fetching positions (attempt {attempt + 1}/{max_retries + 1}): {e}")
                     if attempt < max_retries:
-                        wait_time = 5 * (2 ** attempt)
-                        logger.warning(f"Retrying in {wait_time}s...")
+                        wait_time = self._backoff_delay(5 * (2 ** attempt))
+                        logger.warning(f"Retrying in {wait_time:.1f}s...")
                         await self._sleep_with_check(wait_time)  # 使用可中断的 sleep
         
         # If all retries failed, use safe fallback with empty positions
@@ -399,8 +540,39 @@ class TradingBot:
         logger.warning("⚠️ System will continue with no positions. This is safe but may miss existing trades.")
         return []
     
+    @staticmethod
+    def _invalid_position_symbols(positions: List[Dict]) -> List[str]:
+        """返回关键字段缺失的持仓 symbol 列表（交易所偶发返回 None）"""
+        return [
+            pos.get('symbol') for pos in positions
+            if pos.get('contracts') and any(pos.get(field) is None for field in POSITION_CRITICAL_FIELDS)
+        ]
+    
+    def _record_positions_failure(self) -> bool:
+        """记录一次持仓获取失败，达到阈值时打开熔断器并返回 True"""
+        self._positions_fail_count += 1
+        if self._positions_fail_count < self.positions_cb_threshold:
+            return False
+        self._positions_fail_count = 0
+        self._positions_cb_until = time.monotonic() + self.positions_cb_cooldown
+        logger.error(
+            f"⛔ Position fetch failed {self.positions_cb_threshold} times in a row, "
+            f"pausing requests for {self.positions_cb_cooldown:.0f}s"
+        )
+        return True
+    
+    async def _exchange_call(self, method, *args, **kwargs):
+        """在共享信号量下调用交易所接口（全局并发上限）"""
+        async with self._exchange_sem:
+            return await method(*args, **kwargs)
+    
+    @staticmethod
+    def _backoff_delay(base: float, spread: float = 3.0) -> float:
+        """带随机抖动的退避时间，避免多个请求同步重试"""
+        return random.uniform(base, base * spread)
+    
     async def run_trading_loop(self):
-        """Main trading loop."""
+        """Main trading loop (decision producer; orders are placed by run_execution_loop)."""
         iteration = 0
         
         try:
@@ -424,42 +596,73 @@ class TradingBot:
             logger.info("🛑 Trading loop cancelled")
             raise
     
+    async def run_execution_loop(self):
+        """执行循环：从决策队列取出决策并下单（与下一轮的行情采集重叠，账户读取会等待执行完成）"""
+        queue = self._decision_queue
+        try:
+            while self.running:
+                decisions, positions, current_prices, thinking, position_map = await queue.get()
+                try:
+                    # 入场前仍按实时价格做滑点/风险回报校验，决策生成时的价格仅作参考
+                    execution_summary = await self.execute_decisions(
+                        decisions, positions, current_prices, thinking,
+                        position_map=position_map
+                    )
+                    self._log_execution_summary(execution_summary)
+                    self._log_performance_summary()
+                except Exception as e:
+                    logger.error(f"❌ Error executing decisions: {e}", exc_info=True)
+                finally:
+                    # 执行前后的账户快照已过时，下一轮迭代重新请求余额和持仓
+                    self._account_snapshot = None
+                    self._account_snapshot_floor = time.monotonic()
+                    queue.task_done()
+        except asyncio.CancelledError:
+            logger.info("🛑 Execution loop cancelled")
+            raise
+    
     async def _run_trading_iteration(self):
-        """执行一次交易迭代（解耦，减少缩进）"""
-        # Step 1: Collect market data
-        market_data = await self.collect_market_data()
-        if not self.running:
-            return
-        
-        # Step 2: Get current account state
-        balance = await self.exchange.fetch_balance()
-        if not self.running:
-            return
+        """执行一次决策迭代：采集数据、调用LLM，校验后的决策交给执行循环"""
+        # Step 1: Collect market data（与上一批决策的执行重叠，行情不依赖持仓）
+        market_task = asyncio.create_task(self.collect_market_data())
+        try:
+            # Step 2: Get current account state
+            # 上一批决策执行完成后再读取账户，避免对刚下单的币种重复开仓或与执行中的订单冲突
+            await self._decision_queue.join()
+            balance, positions = await self._get_account_snapshot()
+            if not self.running:
+                return
             
-        positions = await self.fetch_positions_with_retry(max_retries=3)
-        if not self.running:
-            return
+            market_data = await market_task
+            if not self.running:
+                return
+        finally:
+            if not market_task.done():
+                market_task.cancel()
         
         realtime_prices = self._convert_to_realtime_prices()
         account_state = self.portfolio.calculate_account_state(
             balance, positions, realtime_prices=realtime_prices
         )
         formatted_positions = self.portfolio.format_positions_for_prompt(positions)
+        position_map = {p['symbol']: p for p in formatted_positions}
         
         logger.info(f"Account: ${account_state['total_value']:.2f} | "
                   f"Return: {account_state['total_return']:.2f}% | "
                   f"Positions: {account_state['num_positions']}")
         
-        self.db.save_account_state(account_state)
+        self.db_writer.save_account_state(account_state)
         current_prices = self._save_market_prices(market_data)
         
         # Step 3: Check invalidation conditions
-        await self._handle_invalidated_positions(formatted_positions, current_prices)
+        await self._handle_invalidated_positions(formatted_positions, position_map, current_prices)
         if not self.running:
             return
         
         # Step 4: Build prompt and get AI decision
-        prompt = self.prompt_builder.build_trading_prompt(
+        # 提示词构建/决策校验是同步CPU工作，放到线程中执行，避免阻塞WebSocket和写库循环
+        prompt = await asyncio.to_thread(
+            self.prompt_builder.build_trading_prompt,
             market_data=market_data,
             account_state=account_state,
             positions=formatted_positions
@@ -476,54 +679,88 @@ class TradingBot:
             return
         
         decisions, thinking = self._extract_decisions(llm_result)
-        validated_decisions = self._validate_decisions(
+        validated_decisions = await asyncio.to_thread(
+            self._validate_decisions,
             decisions, current_prices, account_state['total_value']
         )
         
-        # Step 5: Execute trades
-        execution_summary = await self.execute_decisions(
-            validated_decisions, formatted_positions, current_prices, thinking
+        # Step 5: Hand off to the execution loop (the queue is empty after join() above)
+        await self._decision_queue.put(
+            (validated_decisions, formatted_positions, current_prices, thinking, position_map)
         )
-        if not self.running:
-            return
-        
-        self._log_execution_summary(execution_summary)
-        self._log_performance_summary()
+    
+    async def _get_account_snapshot(self) -> Tuple[Dict, List[Dict]]:
+        """获取余额和持仓：账户刷新循环的快照足够新时直接复用，否则重新请求"""
+        snapshot = self._account_snapshot
+        if snapshot is not None and time.monotonic() - snapshot[2] < self.account_snapshot_max_age:
+            return snapshot[0], snapshot[1]
+        balance, positions = await asyncio.gather(
+            self._exchange_call(self.exchange.fetch_balance),
+            self.fetch_positions_with_retry(max_retries=3)
+        )
+        return balance, positions
     
     def _convert_to_realtime_prices(self) -> Dict[str, float]:
         """转换价格格式（解耦）"""
-        realtime_prices = {}
-        for symbol, price in self.latest_prices.items():
-            if symbol.endswith('USDT'):
-                base = symbol[:-4]
-                realtime_prices[f"{base}/USDT:USDT"] = price
-        return realtime_prices
+        symbol_table = self._symbol_table
+        return {
+            symbol_table[ws_symbol][1]: price
+            for ws_symbol, price in self.latest_prices.items()
+            if ws_symbol in symbol_table
+        }
+    
+    def _symbol_for(self, coin: str) -> str:
+        """币种 -> 合约交易对（'BTC' -> 'BTC/USDT:USDT'）"""
+        return self._symbol_of_coin.get(coin) or f"{coin}/USDT:USDT"
+    
+    def _ws_symbol_for(self, coin: str) -> str:
+        """币种 -> WebSocket交易对（'BTC' -> 'BTCUSDT'）"""
+        return self._ws_symbol_of_coin.get(coin) or f"{coin}USDT"
     
     def _save_market_prices(self, market_data: Dict) -> Dict[str, float]:
         """保存市场价格并返回当前价格字典（解耦）"""
         current_prices = {}
+        ticks = {}
         for coin, data in market_data.items():
-            latest = data['intraday_df'].iloc[-1]
-            price_data = {
-                'price': float(latest['close']),
-                'rsi_14': float(latest.get('rsi_14', 0)),
-                'macd': float(latest.get('macd', 0)),
-                'funding_rate': float(data.get('funding_rate', 0)),
-                'open_interest': float(data.get('open_interest', 0))
-            }
-            self.db.save_coin_price(coin, price_data)
-            current_prices[coin] = price_data['price']
+            tick = self._latest_price_data(
+                data['intraday_df'],
+                data.get('funding_rate', 0),
+                data.get('open_interest', 0)
+            )
+            ticks[coin] = tick
+            self._last_written_price[coin] = tick.price
+            current_prices[coin] = tick.price
+        # 每轮迭代只在这里写一次价格（含指标），单个事务批量写入
+        self.db_writer.save_coin_prices_bulk(ticks)
         return current_prices
     
-    async def _handle_invalidated_positions(self, formatted_positions: List[Dict], current_prices: Dict[str, float]):
+    @staticmethod
+    def _latest_price_data(df, funding_rate: float, open_interest: float) -> PriceTick:
+        """提取最新一根K线的价格/指标（按列取标量，避免 iloc[-1] 构造整行Series）"""
+        last_idx = len(df) - 1
+        columns = df.columns
+        return PriceTick(
+            price=float(df['close'].iat[last_idx]),
+            rsi_14=float(df['rsi_14'].iat[last_idx]) if 'rsi_14' in columns else 0.0,
+            macd=float(df['macd'].iat[last_idx]) if 'macd' in columns else 0.0,
+            funding_rate=float(funding_rate or 0),
+            open_interest=float(open_interest or 0)
+        )
+    
+    async def _handle_invalidated_positions(
+        self,
+        formatted_positions: List[Dict],
+        position_map: Dict[str, Dict],
+        current_prices: Dict[str, float]
+    ):
         """处理失效的持仓（解耦）"""
         to_invalidate = await self.order_manager.check_invalidation_conditions(
             formatted_positions, current_prices
         )
         
         for coin in to_invalidate:
-            symbol = f"{coin}/USDT:USDT"
-            pos = next((p for p in formatted_positions if p['symbol'] == coin), None)
+            symbol = self._symbol_for(coin)
+            pos = position_map.get(coin)
             if pos:
                 logger.warning(f"⚠️  Closing {coin} (invalidation triggered)")
                 await self.order_manager.execute_close(coin, symbol, pos)
@@ -533,7 +770,7 @@ class TradingBot:
         decisions = llm_result.get('decisions', {})
         thinking = llm_result.get('thinking', '')
         
-        if thinking and len(thinking) > 0:
+        if thinking and logger.isEnabledFor(logging.INFO):
             preview = thinking[:150] + "..." if len(thinking) > 150 else thinking
             logger.info(f"💭 AI Thinking: {preview}")
         
@@ -564,6 +801,8 @@ class TradingBot:
     
     def _log_execution_summary(self, execution_summary: Dict):
         """记录执行摘要（解耦）"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
         total_actions = sum(execution_summary.values())
         if total_actions > 0:
             actions = []
@@ -577,6 +816,9 @@ class TradingBot:
     
     def _log_performance_summary(self):
         """记录性能摘要（解耦）"""
+        # 指标需遍历整条权益曲线，日志级别不输出INFO时直接跳过
+        if not logger.isEnabledFor(logging.INFO):
+            return
         performance = self.portfolio.get_performance_metrics()
         if performance and performance['total_trades'] > 0:
             logger.info(f"📊 Performance: "
@@ -592,89 +834,135 @@ class TradingBot:
         Returns:
             Dict with coin -> market data
         """
-        market_data = {}
+        if not self.running:
+            return {}
         
-        for pair in trading_config.trading_pairs:
-            # 检查是否需要停止
+        # 所有交易对并发采集（并发上限由 _exchange_sem 控制），结果保持 trading_pairs 顺序
+        results = await asyncio.gather(
+            *(self._collect_pair_data(pair, coin) for pair, coin in zip(self._pairs, self._coins))
+        )
+        return {coin: data for coin, data in results if data is not None}
+    
+    async def _collect_pair_data(self, pair: str, coin: str) -> Tuple[str, Optional[Dict]]:
+        """采集单个交易对的K线/资金费率/持仓量数据，失败或无数据时返回 (coin, None)"""
+        try:
+            # 使用CCXT获取历史数据（更稳定）
+            # WebSocket用于实时价格更新，不用于历史数据
+            # 3分钟/4小时K线、资金费率、持仓量互不依赖，并发请求
+            intraday_df, longterm_df, funding_data, oi_data = await asyncio.gather(
+                self._fetch_ohlcv_cached(pair, '3m', limit=100),
+                self._fetch_ohlcv_cached(pair, '4h', limit=100),
+                self._exchange_call(self.data_client.fetch_funding_rate, pair),
+                self._exchange_call(self.data_client.fetch_open_interest, pair)
+            )
+            
             if not self.running:
-                return market_data
-                
-            coin = pair.split('/')[0]  # Extract 'BTC' from 'BTC/USDT:USDT'
+                return coin, None
             
-            try:
-                # 使用CCXT获取历史数据（更稳定）
-                # WebSocket用于实时价格更新，不用于历史数据
-                intraday_df = await self.data_client.fetch_ohlcv(
-                    symbol=pair,
-                    timeframe='3m',
-                    limit=100
-                )
-                
-                if not self.running:
-                    return market_data
-                
-                if intraday_df.empty:
-                    logger.warning(f"No data for {coin}, skipping")
-                    continue
-                
-                # Add indicators
-                intraday_df = self.indicator_engine.add_all_indicators(intraday_df)
-                
-                # Fetch 4-hour longer-term data
-                longterm_df = await self.data_client.fetch_ohlcv(
-                    symbol=pair,
-                    timeframe='4h',
-                    limit=100
-                )
-                
-                if not self.running:
-                    return market_data
-                
-                if longterm_df.empty:
-                    logger.warning(f"No longterm data for {coin}, skipping")
-                    continue
-                
-                # Add indicators to long-term data
-                longterm_df = self.indicator_engine.add_all_indicators(longterm_df)
-                
-                # Fetch funding rate and open interest from data client
-                funding_data = await self.data_client.fetch_funding_rate(pair)
-                oi_data = await self.data_client.fetch_open_interest(pair)
-                
-                # Calculate OI average (last 24 hours approximation)
-                oi_average = oi_data.get('open_interest', 0) * 0.98  # Placeholder
-                
-                market_data[coin] = {
-                    'intraday_df': intraday_df,
-                    'longterm_df': longterm_df,
-                    'funding_rate': funding_data.get('funding_rate', 0),
-                    'open_interest': oi_data.get('open_interest', 0),
-                    'oi_average': oi_average
-                }
-                
-                # Save price data to database
-                latest = intraday_df.iloc[-1]
-                self.db.save_coin_price(coin, {
-                    'price': latest['close'],
-                    'rsi_14': latest.get('rsi_14', 0),
-                    'macd': latest.get('macd', 0),
-                    'funding_rate': funding_data.get('funding_rate', 0),
-                    'open_interest': oi_data.get('open_interest', 0)
-                })
-                
-                # Data collected silently
+            if intraday_df.empty:
+                logger.warning(f"No data for {coin}, skipping")
+                return coin, None
             
-            except Exception as e:
-                logger.error(f"Failed to collect data for {coin}: {e}")
+            if longterm_df.empty:
+                logger.warning(f"No longterm data for {coin}, skipping")
+                return coin, None
+            
+            # Add indicators（在进程池中并行计算）
+            intraday_df, longterm_df = await asyncio.gather(
+                self._compute_indicators(intraday_df),
+                self._compute_indicators(longterm_df)
+            )
+            
+            # Calculate OI average (last 24 hours approximation)
+            oi_average = oi_data.get('open_interest', 0) * 0.98  # Placeholder
+            
+            return coin, {
+                'intraday_df': intraday_df,
+                'longterm_df': longterm_df,
+                'funding_rate': funding_data.get('funding_rate', 0),
+                'open_interest': oi_data.get('open_interest', 0),
+                'oi_average': oi_average
+            }
         
-        return market_data
+        except Exception as e:
+            logger.error(f"Failed to collect data for {coin}: {e}")
+            return coin, None
+    
+    async def _fetch_ohlcv_cached(self, pair: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
+        """
+        获取最近 limit 根K线：有缓存时只拉取最新 ohlcv_refresh_bars 根并与缓存拼接，
+        结果与全量拉取相同（指标仍在完整窗口上计算，保证数值一致）
+        """
+        key = (pair, timeframe)
+        cached = self._ohlcv_cache.get(key)
+        
+        if cached is not None and len(cached) >= limit:
+            fresh = await self._exchange_call(
+                self.data_client.fetch_ohlcv,
+                symbol=pair,
+                timeframe=timeframe,
+                limit=self.ohlcv_refresh_bars
+            )
+            # 增量数据必须与缓存衔接，否则说明中间有缺口，回退到全量拉取
+            if not fresh.empty and fresh['timestamp'].iat[0] <= cached['timestamp'].iat[-1]:
+                first_ts = fresh['timestamp'].iat[0]
+                merged = pd.concat(
+                    [cached[cached['timestamp'] < first_ts], fresh],
+                    ignore_index=True
+                )
+                merged = merged.iloc[-limit:].reset_index(drop=True)
+                self._ohlcv_cache[key] = merged
+                return merged
+        
+        df = await self._exchange_call(
+            self.data_client.fetch_ohlcv,
+            symbol=pair,
+            timeframe=timeframe,
+            limit=limit
+        )
+        if not df.empty:
+            self._ohlcv_cache[key] = df
+        return df
+    
+    def _get_cpu_pool(self) -> ProcessPoolExecutor:
+        """获取（必要时创建）指标计算进程池"""
+        if self._cpu_pool is None:
+            # spawn：当前进程已有写库线程，fork 可能继承被占用的锁
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=self._cpu_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._cpu_pool
+    
+    async def _warm_cpu_pool(self):
+        """提前启动进程池的工作进程（子进程导入依赖需要数秒）"""
+        if not self.indicator_pool_enabled:
+            return
+        pool = self._get_cpu_pool()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, int) for _ in range(self._cpu_workers)))
+    
+    async def _compute_indicators(self, df):
+        """在进程池中计算技术指标；进程池不可用时回退到当前线程计算"""
+        if not self.indicator_pool_enabled:
+            return self.indicator_engine.add_all_indicators(df)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_cpu_pool(), IndicatorEngine.add_all_indicators, df
+            )
+        except BrokenProcessPool as e:
+            if self.indicator_pool_enabled:
+                logger.warning(f"Indicator process pool unavailable ({e}), computing inline from now on")
+                self.indicator_pool_enabled = False
+            return self.indicator_engine.add_all_indicators(df)
     
     async def execute_decisions(
         self,
         decisions: Dict[str, Dict],
         current_positions: List[Dict],
         current_prices: Dict[str, float],
-        thinking: str = ""
+        thinking: str = "",
+        position_map: Optional[Dict[str, Dict]] = None
     ) -> Dict[str, int]:
         """
         Execute validated trading decisions and save successful ones to database.
@@ -684,78 +972,97 @@ class TradingBot:
             current_positions: Current portfolio positions
             current_prices: Current market prices
             thinking: AI thinking process to save with successful decisions
+            position_map: Pre-built {symbol: position} map (built from current_positions if omitted)
         
         Returns:
             Dict with execution summary: {'entries': int, 'closes': int, 'holds': int, 'no_actions': int}
         """
-        position_map = {pos['symbol']: pos for pos in current_positions}
+        if position_map is None:
+            position_map = {pos['symbol']: pos for pos in current_positions}
+        
+        # 各币种的下单互不依赖（不同交易对），并发执行；结果按决策顺序汇总
+        results = await asyncio.gather(*(
+            self._apply_decision(coin, decision, current_prices, position_map)
+            for coin, decision in decisions.items()
+        ))
         
         # Track execution summary
         summary = {'entries': 0, 'closes': 0, 'holds': 0, 'no_actions': 0}
-        
-        for coin, decision in decisions.items():
-            if 'trade_signal_args' not in decision:
+        # 成功执行的决策在本轮结束后一次性写库
+        pending_saves: List[Tuple[str, Dict, str]] = []
+        for (coin, decision), outcome in zip(decisions.items(), results):
+            if outcome is None:
                 continue
+            summary[outcome] += 1
+            # 🆕 只有交易成功执行后才保存AI决策到数据库
+            pending_saves.append((coin, decision, thinking))
+        
+        if pending_saves:
+            self.db_writer.save_ai_decisions_batch(pending_saves)
+        
+        return summary
+    
+    async def _apply_decision(
+        self,
+        coin: str,
+        decision: Dict,
+        current_prices: Dict[str, float],
+        position_map: Dict[str, Dict]
+    ) -> Optional[str]:
+        """
+        执行单个币种的决策。
+        
+        Returns:
+            成功时返回 summary 中对应的计数键（'entries'/'closes'/'holds'/'no_actions'），
+            未执行或失败时返回 None（不保存AI决策）
+        """
+        if 'trade_signal_args' not in decision:
+            return None
+        
+        args = decision['trade_signal_args']
+        signal = args.get('signal')
+        symbol = self._symbol_for(coin)
+        
+        try:
+            if signal == 'entry':
+                # Open new position
+                await self.execute_entry(coin, symbol, args, current_prices[coin])
+                logger.info(f"✅ Successfully opened position for {coin}")
+                return 'entries'
             
-            args = decision['trade_signal_args']
-            signal = args.get('signal')
-            symbol = f"{coin}/USDT:USDT"
-            
-            try:
-                execution_success = False
-                
-                if signal == 'entry':
-                    # Open new position
-                    await self.execute_entry(coin, symbol, args, current_prices[coin])
-                    summary['entries'] += 1
-                    execution_success = True
-                    logger.info(f"✅ Successfully opened position for {coin}")
-                
-                elif signal == 'close_position':
-                    # Close existing position
-                    if coin in position_map:
-                        # 🆕 Log price change since AI decision
-                        decision_price = current_prices[coin]
-                        realtime_price = self.latest_prices.get(f"{coin}USDT", decision_price)
-                        if realtime_price != decision_price:
-                            price_change_pct = (realtime_price - decision_price) / decision_price * 100
-                            logger.info(
-                                f"💱 Price changed {price_change_pct:+.2f}% during AI decision "
-                                f"({decision_price:.4f} → {realtime_price:.4f})"
-                            )
-                        
-                        await self.order_manager.execute_close(
-                            coin,
-                            symbol,
-                            position_map[coin]
+            elif signal == 'close_position':
+                # Close existing position
+                if coin in position_map:
+                    # 🆕 Log price change since AI decision
+                    decision_price = current_prices[coin]
+                    realtime_price = self.latest_prices.get(self._ws_symbol_for(coin), decision_price)
+                    if realtime_price != decision_price:
+                        price_change_pct = (realtime_price - decision_price) / decision_price * 100
+                        logger.info(
+                            f"💱 Price changed {price_change_pct:+.2f}% during AI decision "
+                            f"({decision_price:.4f} → {realtime_price:.4f})"
                         )
-                        summary['closes'] += 1
-                        execution_success = True
-                        logger.info(f"✅ Successfully closed position for {coin}")
-                    else:
-                        logger.warning(f"Cannot close {coin}: no existing position")
-                
-                elif signal == 'hold':
-                    summary['holds'] += 1
-                    execution_success = True
-                
-                elif signal == 'no_action':
-                    summary['no_actions'] += 1
-                    execution_success = True
-                
-                # 🆕 只有交易成功执行后才保存AI决策到数据库
-                if execution_success:
-                    try:
-                        self.db.save_ai_decision(coin, decision, thinking)
-                        # Decision saved silently
-                    except Exception as e:
-                        logger.error(f"Failed to save decision for {coin}: {e}")
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to execute {signal} for {coin}: {e}")
-                # 交易失败，不保存AI决策
+                    
+                    await self.order_manager.execute_close(
+                        coin,
+                        symbol,
+                        position_map[coin]
+                    )
+                    logger.info(f"✅ Successfully closed position for {coin}")
+                    return 'closes'
+                logger.warning(f"Cannot close {coin}: no existing position")
+            
+            elif signal == 'hold':
+                return 'holds'
+            
+            elif signal == 'no_action':
+                return 'no_actions'
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to execute {signal} for {coin}: {e}")
+            # 交易失败，不保存AI决策
         
-        return summary
+        return None
     
     async def execute_entry(
         self,
@@ -770,59 +1077,62 @@ class TradingBot:
         take_profit = args.get('profit_target')
         risk_usd = args.get('risk_usd')
         
+        # Determine trade direction once (from the price the AI decided on)
+        is_long = take_profit > current_price
+        side = 'buy' if is_long else 'sell'
+        
         # 🆕 Get real-time price (AI may have taken 1-2 mins to decide)
-        realtime_price = self.latest_prices.get(f"{coin}USDT")
+        realtime_price = self.latest_prices.get(self._ws_symbol_for(coin))
         
         if realtime_price:
-            # Determine trade direction first
-            is_long = take_profit > current_price
-            
             # Calculate slippage (signed: positive = price went up)
             price_change_pct = (realtime_price - current_price) / current_price * 100
             
             # 🛡️ 放宽滑点保护：只记录警告，不拒绝交易
             # - Long: price went UP (buying more expensive) = bad
             # - Short: price went DOWN (selling cheaper) = bad
-            exec_protection = trading_config.risk_params.get('execution_protection', {})
-            MAX_SLIPPAGE_WARNING = exec_protection.get('max_slippage_percent', 10.0)  # 提升到10%仅做警告
-            LOG_THRESHOLD = exec_protection.get('log_slippage_threshold_percent', 0.1)
-            
-            unfavorable_slippage = (is_long and price_change_pct > 0) or (not is_long and price_change_pct < 0)
-            
-            # 只警告，不拒绝交易
-            if unfavorable_slippage and abs(price_change_pct) > MAX_SLIPPAGE_WARNING:
-                logger.warning(
-                    f"⚠️ High unfavorable slippage: price {'rose' if price_change_pct > 0 else 'fell'} "
-                    f"{abs(price_change_pct):.2f}% during AI decision "
-                    f"({current_price:.4f} → {realtime_price:.4f}). "
-                    f"{'Buying more expensive' if is_long else 'Selling cheaper'}. "
-                    f"Proceeding with trade anyway (warning threshold: {MAX_SLIPPAGE_WARNING}%)"
-                )
+            MAX_SLIPPAGE_WARNING = self._max_slippage_warning
+            LOG_THRESHOLD = self._slippage_log_threshold
             
-            # Log favorable slippage as good news!
-            if not unfavorable_slippage and abs(price_change_pct) > LOG_THRESHOLD:
-                logger.info(
-                    f"✅ Favorable slippage: price {'fell' if is_long else 'rose'} "
-                    f"{abs(price_change_pct):.2f}%! "
-                    f"{'Buying cheaper' if is_long else 'Selling higher'}: {realtime_price:.4f}"
-                )
-            # Log unfavorable but acceptable slippage
-            elif unfavorable_slippage and abs(price_change_pct) > LOG_THRESHOLD:
-                logger.info(
-                    f"💱 Acceptable slippage: {price_change_pct:+.2f}% "
-                    f"({current_price:.4f} → {realtime_price:.4f})"
-                )
+            # 低于记录阈值的小幅波动直接跳过（绝大多数情况），只比较一次
+            abs_pct = abs(price_change_pct)
+            if abs_pct > LOG_THRESHOLD:
+                unfavorable_slippage = price_change_pct > 0 if is_long else price_change_pct < 0
+                
+                # 只警告，不拒绝交易
+                if unfavorable_slippage and abs_pct > MAX_SLIPPAGE_WARNING:
+                    logger.warning(
+                        f"⚠️ High unfavorable slippage: price {'rose' if price_change_pct > 0 else 'fell'} "
+                        f"{abs_pct:.2f}% during AI decision "
+                        f"({current_price:.4f} → {realtime_price:.4f}). "
+                        f"{'Buying more expensive' if is_long else 'Selling cheaper'}. "
+                        f"Proceeding with trade anyway (warning threshold: {MAX_SLIPPAGE_WARNING}%)"
+                    )
+                elif logger.isEnabledFor(logging.INFO):
+                    # Log unfavorable but acceptable slippage
+                    if unfavorable_slippage:
+                        logger.info(
+                            f"💱 Acceptable slippage: {price_change_pct:+.2f}% "
+                            f"({current_price:.4f} → {realtime_price:.4f})"
+                        )
+                    # Log favorable slippage as good news!
+                    else:
+                        logger.info(
+                            f"✅ Favorable slippage: price {'fell' if is_long else 'rose'} "
+                            f"{abs_pct:.2f}%! "
+                            f"{'Buying cheaper' if is_long else 'Selling higher'}: {realtime_price:.4f}"
+                        )
             
             current_price = realtime_price
             
             # 🆕 Re-validate R/R ratio with new price (if enabled)
-            if exec_protection.get('revalidate_rr_ratio', True):
+            if self._revalidate_rr:
                 risk_distance = abs(current_price - stop_loss)
                 reward_distance = abs(take_profit - current_price)
                 
                 if risk_distance > 0:
                     new_rr_ratio = reward_distance / risk_distance
-                    min_rr = trading_config.risk_params['exit_strategy']['min_risk_reward_ratio']
+                    min_rr = self._min_rr
                     
                     if new_rr_ratio < min_rr:
                         logger.warning(
@@ -849,19 +1159,14 @@ class TradingBot:
             logger.warning(f"Position size is zero for {coin}, skipping entry")
             return
         
-        # Determine side (long or short)
-        if take_profit > current_price:
-            side = 'buy'  # Long
-        else:
-            side = 'sell'  # Short
-        
-        logger.info(f"Entering {side.upper()} position for {coin}:")
-        logger.info(f"  Size: {position_size:.4f}")
-        logger.info(f"  Leverage: {leverage}x")
-        logger.info(f"  Entry: {current_price}")
-        logger.info(f"  Stop Loss: {stop_loss}")
-        logger.info(f"  Take Profit: {take_profit}")
-        logger.info(f"  Risk: ${risk_usd:.2f}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Entering {side.upper()} position for {coin}:")
+            logger.info(f"  Size: {position_size:.4f}")
+            logger.info(f"  Leverage: {leverage}x")
+            logger.info(f"  Entry: {current_price}")
+            logger.info(f"  Stop Loss: {stop_loss}")
+            logger.info(f"  Take Profit: {take_profit}")
+            logger.info(f"  Risk: ${risk_usd:.2f}")
         
         # Execute entry with SL/TP
         result = await self.order_manager.execute_entry(
@@ -912,8 +1217,7 @@ class TradingBot:
         
         # Close exchange connections
         try:
-            if hasattr(self.data_client, 'exchange'):
-                await self.data_client.exchange.close()
+            await self.data_client.close()
         except Exception:
             pass
         
@@ -925,5 +1229,14 @@ class TradingBot:
             except Exception:
                 pass
         
+        # 关闭指标计算进程池
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
+        
+        # 写完队列中剩余的数据库操作
+        if hasattr(self, 'db_writer'):
+            await asyncio.to_thread(self.db_writer.stop)
+        
         logger.info("✅ Shutdown complete")
 
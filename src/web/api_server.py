@@ -4,26 +4,81 @@ Provides HTTP endpoints for monitoring trading bot status and data.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
 from ..database import TradingDatabase
 
+# 可选：orjson（C实现，大数组序列化更快）；未安装时使用默认的 JSONResponse
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    orjson = None
+    from fastapi.responses import JSONResponse as FastJSONResponse
+
+
+def _dumps(data) -> str:
+    """序列化为紧凑JSON文本（与 WebSocket.send_json 的编码一致）"""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _ndjson_chunks(rows: List[Dict], batch: int = 500):
+    """按批生成NDJSON文本（每行一条记录），避免一次性拼出整个响应体"""
+    for i in range(0, len(rows), batch):
+        yield "".join(_dumps(row) + "\n" for row in rows[i:i + batch])
+
+
 logger = logging.getLogger(__name__)
 
+# 仪表盘静态文件目录（模块加载时计算一次）
+_STATIC_DIR = Path(__file__).parent.parent.parent.parent / "static"
+_INDEX_HTML = _STATIC_DIR / "index.html"
+
+# 文件名带内容哈希（如 app.3f2a9c1b.js）的静态资源内容不会变化，可长期缓存
+_HASHED_ASSET_RE = re.compile(r'\.[0-9a-f]{8,}\.')
+
+# 交易对格式校验（如 BTC、BTC/USDT、BTC/USDT:USDT）
+_symbol_match = re.compile(r'^[A-Z0-9]+(?:/[A-Z0-9]+)*(?::[A-Z0-9]+)?$').match
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    附加 Cache-Control 的静态文件服务。
+    StaticFiles 自带 ETag/Last-Modified 条件请求处理（未修改时返回304）；
+    带哈希的资源长期缓存，其余文件要求浏览器每次用 ETag 重新验证。
+    """
+    
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if _HASHED_ASSET_RE.search(Path(full_path).name):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
 
 class WebAPIServer:
     """Web API server for monitoring trading bot."""
     
-    def __init__(self, db: TradingDatabase, port: int = 8541, running_callback=None):
+    def __init__(self, db: TradingDatabase, port: int = 8541, running_callback=None,
+                 compress_min_size: int = 1024):
         """
         Initialize Web API server.
         
@@ -31,17 +86,99 @@ class WebAPIServer:
             db: TradingDatabase instance for data access
             port: Port number for the web server
             running_callback: Callable that returns running status (for WebSocket)
+            compress_min_size: Minimum response size in bytes to gzip (0 disables compression)
         """
         self.db = db
         self.port = port
         self.running_callback = running_callback or (lambda: True)
+        self.compress_min_size = compress_min_size
         self.app: Optional[FastAPI] = None
         self.server_task: Optional[asyncio.Task] = None
         self.running = False
+        
+        # /ws 推送：单个后台任务每3秒轮询一次数据库（机器人在独立进程中写库），
+        # 所有连接共享一次查询和序列化结果，数据未变化时不推送
+        self.ws_push_interval = 3
+        self._ws_clients: Set[WebSocket] = set()
+        self._ws_payload: Optional[str] = None
+        # 广播快照复用同一个 dict，每次只替换三个字段
+        self._ws_data: Dict[str, Any] = {"account": None, "prices": None, "positions": None}
+        self._ws_broadcast_task: Optional[asyncio.Task] = None
+        
+        # 最新账户/价格/持仓的短TTL缓存：数据每几秒才更新，多个接口和客户端共享一次查询
+        self.cache_ttl = 1.0
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_locks: Dict[str, asyncio.Lock] = {}
+        
+        # 同步数据库查询在专用线程上执行，避免阻塞事件循环（单线程，与SQLite单连接池一致）
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='web-db')
+    
+    async def _db(self, fn: Callable, *args) -> Any:
+        """在数据库线程上执行同步查询"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, partial(fn, *args))
+    
+    async def _cached(self, key: str, loader: Callable[[], Any]) -> Any:
+        """返回 TTL 内的缓存结果，过期时调用 loader 重新查询（异常不缓存，同一key只查询一次）"""
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        async with self._cache_locks.setdefault(key, asyncio.Lock()):
+            # 等锁期间其他请求可能已刷新缓存
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            value = await self._db(loader)
+            self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+            return value
+    
+    async def _latest_account(self) -> Optional[Dict]:
+        return await self._cached('account', self.db.get_latest_account_state)
+    
+    async def _latest_prices(self) -> Dict:
+        return await self._cached('prices', self.db.get_latest_prices)
+    
+    async def _active_positions(self) -> list:
+        return await self._cached('positions', self.db.get_active_positions)
+    
+    @staticmethod
+    def _ndjson_response(rows: List[Dict], mode: str, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+        """流式返回NDJSON（30天全量数据时客户端可边接收边解析），元信息放在响应头"""
+        return StreamingResponse(
+            _ndjson_chunks(rows),
+            media_type="application/x-ndjson",
+            headers={**(headers or {}), "X-Result-Count": str(len(rows)), "X-Sampling-Mode": mode}
+        )
+    
+    @staticmethod
+    def _history_etag(version: Optional[str], *params) -> Optional[str]:
+        """历史接口的弱ETag：数据版本（最新时间戳+行数）与查询参数的摘要；无数据时不生成"""
+        if version is None:
+            return None
+        key = "|".join(str(part) for part in (version, *params))
+        return f'W/"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+    
+    @staticmethod
+    def _etag_headers(etag: Optional[str]) -> Optional[Dict[str, str]]:
+        return {"ETag": etag, "Cache-Control": "no-cache"} if etag else None
+    
+    @staticmethod
+    def _conditional_response(request: Request, content: Any, version: Optional[str]):
+        """
+        以数据版本（最新记录的时间戳）作为弱ETag；客户端 If-None-Match 匹配时返回304，
+        跳过序列化和传输。无版本信息时直接返回数据。
+        """
+        if not version:
+            return content
+        etag = f'W/"{version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return FastJSONResponse(content, headers=headers)
     
     def create_app(self) -> FastAPI:
         """Create and configure FastAPI application."""
-        app = FastAPI(title="AI Trading Monitor")
+        app = FastAPI(title="AI Trading Monitor", default_response_class=FastJSONResponse)
         
         # Add CORS middleware
         app.add_middleware(
@@ -52,35 +189,38 @@ class WebAPIServer:
             allow_headers=["*"],
         )
         
+        # 历史/交易等JSON响应压缩率高，超过阈值时gzip（客户端不支持时原样返回）
+        if self.compress_min_size > 0:
+            app.add_middleware(GZipMiddleware, minimum_size=self.compress_min_size)
+        
         # Mount static files
-        static_dir = Path(__file__).parent.parent.parent.parent / "static"
-        static_dir.mkdir(exist_ok=True)
-        app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+        _STATIC_DIR.mkdir(exist_ok=True)
+        app.mount("/static", CachedStaticFiles(directory=str(_STATIC_DIR)), name="static")
         
         # Register routes
         self._register_routes(app)
         
+        # 首页：存在 index.html 时由 StaticFiles 提供（支持304），须在API路由之后挂载
+        if _INDEX_HTML.exists():
+            app.mount("/", CachedStaticFiles(directory=str(_STATIC_DIR), html=True), name="root")
+        else:
+            @app.get("/")
+            async def read_root():
+                """Return API info (no dashboard build found)."""
+                return {"message": "AI Trading Monitor API"}
+        
         return app
     
     def _register_routes(self, app: FastAPI):
         """Register API routes."""
         
-        @app.get("/")
-        async def read_root():
-            """Return homepage."""
-            static_dir = Path(__file__).parent.parent.parent.parent / "static"
-            html_file = static_dir / "index.html"
-            if html_file.exists():
-                return FileResponse(html_file)
-            return {"message": "AI Trading Monitor API"}
-        
         @app.get("/health")
         async def health_check():
             """Health check endpoint for monitoring and container orchestration."""
             account = None
             try:
                 # Check database connection
-                account = self.db.get_latest_account_state()
+                account = await self._latest_account()
                 db_status = "healthy"
             except Exception as e:
                 logger.error(f"Database health check failed: {e}")
@@ -103,16 +243,20 @@ class WebAPIServer:
             return await health_check()
         
         @app.get("/api/account")
-        async def get_account():
+        async def get_account(request: Request):
             """Get account status."""
-            account = self.db.get_latest_account_state()
-            return account or {"total_value": 0, "total_return": 0, "num_positions": 0}
+            account = await self._latest_account()
+            if not account:
+                return {"total_value": 0, "total_return": 0, "num_positions": 0}
+            return self._conditional_response(request, account, account.get("timestamp"))
         
         @app.get("/api/prices")
-        async def get_prices():
+        async def get_prices(request: Request):
             """Get latest prices."""
-            prices = self.db.get_latest_prices()
-            return prices
+            prices = await self._latest_prices()
+            # 任一币种写入新价格都会产生更新的时间戳
+            version = max((p.get("timestamp") or "" for p in prices), default="")
+            return self._conditional_response(request, prices, version)
         
         @app.get("/api/decisions")
         async def get_decisions(limit: int = 20):
@@ -120,20 +264,23 @@ class WebAPIServer:
             # Input validation
             if limit < 1 or limit > 1000:
                 limit = 20
-            decisions = self.db.get_recent_decisions(limit)
-            return decisions
+            decisions = await self._db(self.db.get_recent_decisions, limit)
+            # to_dict() 已输出基础类型，直接编码（最多1000条，跳过 jsonable_encoder）
+            return FastJSONResponse(decisions)
         
         @app.get("/api/positions")
         async def get_positions():
             """Get current positions."""
-            positions = self.db.get_active_positions()
-            return positions
+            positions = await self._active_positions()
+            return FastJSONResponse(positions)
         
         @app.get("/api/account_history")
         async def get_account_history(
+            request: Request,
             hours: int = 24, 
             mode: str = 'auto',
-            since: str = None
+            since: str = None,
+            format: str = 'json'
         ):
             """
             Get account history data with smart sampling.
@@ -142,6 +289,7 @@ class WebAPIServer:
                 hours: Number of hours to query (default: 24)
                 mode: Sampling mode ('full', 'auto', 'fast')
                 since: ISO timestamp for incremental query (optional)
+                format: 'json' (default) or 'ndjson' (one record per line, streamed)
             """
             # Input validation
             if mode not in ['full', 'auto', 'fast']:
@@ -150,84 +298,134 @@ class WebAPIServer:
             if hours < 1 or hours > 720:
                 hours = 24
             
+            # 窗口数据版本未变化时直接返回304，跳过历史查询、采样和序列化
+            version = await self._db(self.db.get_account_history_version, hours, since)
+            etag = self._history_etag(version, hours, mode, since, format)
+            if etag and request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers=self._etag_headers(etag))
+            headers = self._etag_headers(etag)
+            
             if since:
                 # Incremental query
-                history = self.db.get_account_history_since(since)
-                return {
+                history = await self._db(self.db.get_account_history_since, since)
+                if format == 'ndjson':
+                    return self._ndjson_response(history, "incremental", headers)
+                return FastJSONResponse({
                     "data": history,
                     "count": len(history),
                     "mode": "incremental",
                     "since": since
-                }
+                }, headers=headers)
             else:
                 # Full query
-                history = self.db.get_account_history(hours, mode)
-                return {
+                history = await self._db(self.db.get_account_history, hours, mode)
+                if format == 'ndjson':
+                    return self._ndjson_response(history, mode, headers)
+                return FastJSONResponse({
                     "data": history,
                     "count": len(history),
                     "mode": mode,
                     "hours": hours
-                }
+                }, headers=headers)
         
         @app.get("/api/price_history/{symbol}")
-        async def get_price_history(symbol: str, hours: int = 24):
+        async def get_price_history(request: Request, symbol: str, hours: int = 24):
             """Get price history for a symbol."""
             # Input validation
-            if not re.match(r'^[A-Z0-9]+(/[A-Z0-9]+)*(:[A-Z0-9]+)?$', symbol):
-                return {"error": "Invalid symbol format"}
+            if not _symbol_match(symbol):
+                raise HTTPException(status_code=400, detail="Invalid symbol format")
             
             if hours < 1 or hours > 720:
                 hours = 24
             
-            history = self.db.get_price_history(symbol, hours)
-            return history
+            version = await self._db(self.db.get_price_history_version, symbol, hours)
+            etag = self._history_etag(version, symbol, hours)
+            if etag and request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers=self._etag_headers(etag))
+            
+            # 历史数据行已是基础类型，直接序列化（跳过 jsonable_encoder 的逐项遍历）
+            history = await self._db(self.db.get_price_history, symbol, hours)
+            return FastJSONResponse(history, headers=self._etag_headers(etag))
         
         @app.get("/api/trades")
-        async def get_trades(page: int = 1, page_size: int = 10):
+        async def get_trades(cursor: Optional[int] = None, page_size: int = 10):
             """
-            Get trade history with pagination.
+            Get trade history with cursor (keyset) pagination.
             
             Args:
-                page: Page number (starts from 1)
+                cursor: `next_cursor` from the previous page (omit for the first page)
                 page_size: Number of records per page
             """
             # Input validation
-            if page < 1:
-                page = 1
             if page_size < 1 or page_size > 100:
                 page_size = 10
             
-            offset = (page - 1) * page_size
+            # 多取一条判断是否还有下一页，无需 COUNT(*)
+            trades = await self._db(self.db.get_trade_history_paginated, cursor, page_size + 1)
+            has_more = len(trades) > page_size
+            trades = trades[:page_size]
             
-            total = self.db.get_trades_count()
-            trades = self.db.get_trade_history_paginated(offset, page_size)
-            
-            return {
+            result = {
                 "data": trades,
-                "page": page,
                 "page_size": page_size,
-                "total": total,
-                "total_pages": (total + page_size - 1) // page_size
+                "next_cursor": trades[-1]["id"] if has_more else None,
+                "has_more": has_more
             }
+            # 总数只在第一页返回（无限滚动加载后续页时不再重复统计）
+            if cursor is None:
+                result["total"] = await self._db(self.db.get_trades_count)
+            return FastJSONResponse(result)
         
         @app.websocket("/ws")
         async def websocket_endpoint(websocket: WebSocket):
             """WebSocket endpoint for real-time updates."""
             await websocket.accept()
+            self._ws_clients.add(websocket)
             try:
+                # 新连接先收到最近一次快照，之后由广播任务统一推送
+                if self._ws_payload is not None:
+                    await websocket.send_text(self._ws_payload)
+                if self._ws_broadcast_task is None or self._ws_broadcast_task.done():
+                    self._ws_broadcast_task = asyncio.create_task(self._broadcast_loop())
+                
+                # 只需等待客户端断开
                 while self.running:
-                    # Push latest data every 3 seconds
-                    data = {
-                        "account": self.db.get_latest_account_state(),
-                        "prices": self.db.get_latest_prices(),
-                        "positions": self.db.get_active_positions()
-                    }
-                    await websocket.send_json(data)
-                    await asyncio.sleep(3)
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        break
             except Exception as e:
                 logger.error(f"WebSocket error: {e}")
             finally:
-                await websocket.close()
+                self._ws_clients.discard(websocket)
+    
+    async def _broadcast_loop(self):
+        """
+        每 ws_push_interval 秒查询一次最新数据并推送给所有 /ws 连接（无连接时退出）。
+        数据未变化时不推送。
+        """
+        while self.running and self._ws_clients:
+            try:
+                data = self._ws_data
+                data["account"] = await self._latest_account()
+                data["prices"] = await self._latest_prices()
+                data["positions"] = await self._active_positions()
+                # 所有连接共享一次序列化结果
+                payload = _dumps(data)
+                
+                if payload != self._ws_payload:
+                    self._ws_payload = payload
+                    clients = list(self._ws_clients)
+                    results = await asyncio.gather(
+                        *(ws.send_text(payload) for ws in clients),
+                        return_exceptions=True
+                    )
+                    for ws, result in zip(clients, results):
+                        if isinstance(result, Exception):
+                            self._ws_clients.discard(ws)
+            except Exception as e:
+                logger.error(f"WebSocket broadcast error: {e}")
+            
+            await asyncio.sleep(self.ws_push_interval)
     
     async def start(self):
         """Start the web server."""
@@ -236,6 +434,12 @@ class WebAPIServer:
         
         self.running = True
         
+        # 监听端口前预热：启动DB线程并完成首次查询（连接、表元数据、页缓存），首批请求无需承担
+        try:
+            await self._db(self.db.get_latest_account_state)
+        except Exception as e:
+            logger.warning(f"⚠️ Database warm-up failed: {e}")
+        
         logger.info(f"🌐 Starting Web Monitor API on port {self.port}")
         logger.info(f"   Dashboard: http://localhost:{self.port}")
         logger.info(f"   API Docs: http://localhost:{self.port}/docs")
@@ -245,6 +449,7 @@ class WebAPIServer:
             host="0.0.0.0",
             port=self.port,
             log_level="info",
+            http="auto",  # 安装了 httptools 时使用C实现的HTTP解析器，否则回退到 h11
             access_log=False  # Reduce log noise
         )
         server = uvicorn.Server(config)
@@ -260,6 +465,9 @@ class WebAPIServer:
         """Stop the web server."""
         logger.info("🛑 Stopping Web API server...")
         self.running = False
+        if self._ws_broadcast_task and not self._ws_broadcast_task.done():
+            self._ws_broadcast_task.cancel()
+        self._db_executor.shutdown(wait=False)
         if self.server_task and not self.server_task.done():
             self.server_task.cancel()
             try:
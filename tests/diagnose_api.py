@@ -1,13 +1,69 @@
 #!/usr/bin/env python3
 """详细诊断API连接问题"""
 
+import argparse
 import asyncio
+import aiohttp
 import ccxt.async_support as ccxt
 from src.config import settings
 import json
+from typing import List
 
-async def diagnose():
-    """详细诊断"""
+# 与 src/data/exchange_client.py 相同的手动testnet地址覆盖（诊断的正是这套配置，因此不用 set_sandbox_mode）
+# ccxt 构造时会深拷贝合并 urls，模块级常量不会被修改
+TESTNET_API_URLS = {
+    'fapiPublic': 'https://testnet.binancefuture.com/fapi/v1',
+    'fapiPrivate': 'https://testnet.binancefuture.com/fapi/v1',
+    'fapiPrivateV2': 'https://testnet.binancefuture.com/fapi/v2',
+    'public': 'https://testnet.binancefuture.com/fapi/v1',
+    'private': 'https://testnet.binancefuture.com/fapi/v1',
+}
+TESTNET_TIME_URL = 'https://testnet.binancefuture.com/fapi/v1/time'
+
+
+async def _probe_public(exchange) -> List[str]:
+    """测试1: 公共接口（不需要API Key）"""
+    lines = [f"\n✅ 测试1: 公共接口（不需要API Key）"]
+    try:
+        ticker = await exchange.fetch_ticker('BTC/USDT:USDT')
+        lines.append(f"   成功！BTC价格: ${ticker['last']}")
+    except Exception as e:
+        lines.append(f"   失败: {e}")
+    return lines
+
+
+async def _probe_private(exchange) -> List[str]:
+    """测试2: 私有接口（需要API Key）"""
+    lines = [f"\n🔐 测试2: 私有接口（需要API Key）", f"   尝试获取账户余额..."]
+    try:
+        balance = await exchange.fetch_balance()
+        lines.append(f"   ✅ 成功！")
+        lines.append(f"   USDT余额: {balance.get('USDT', {}).get('free', 0)}")
+    except ccxt.AuthenticationError as e:
+        lines.append(f"   ❌ 认证失败: {e}")
+        lines.append(f"\n🔍 问题分析:")
+        lines.append(f"   1. API Key是否真的来自 testnet.binancefuture.com?")
+        lines.append(f"   2. 登录 https://testnet.binancefuture.com 验证API Key是否存在")
+        lines.append(f"   3. 检查API Key权限（需要勾选 'Enable Reading' 和 'Enable Futures'）")
+    except Exception as e:
+        lines.append(f"   ❌ 其他错误: {e}")
+    return lines
+
+
+async def _probe_raw(session: aiohttp.ClientSession) -> List[str]:
+    """测试3: 手动测试testnet endpoint"""
+    lines = [f"\n🌐 测试3: 手动测试testnet endpoint", f"   尝试访问: {TESTNET_TIME_URL}"]
+    try:
+        async with session.get(TESTNET_TIME_URL) as resp:
+            data = await resp.json()
+            lines.append(f"   ✅ Testnet可访问！服务器时间: {data}")
+    except Exception as e:
+        lines.append(f"   ❌ 无法访问testnet: {e}")
+    return lines
+
+
+async def diagnose(verbose: bool = False):
+    """详细诊断（verbose=True 时输出 ccxt 的完整请求/响应日志）"""
     
     print("=" * 70)
     print("🔍 详细API诊断")
@@ -20,68 +76,42 @@ async def diagnose():
     print(f"   API Key完整: {settings.binance_api_key}")
     print(f"   Secret完整: {settings.binance_api_secret}")
     
-    # 2. 创建exchange
-    print(f"\n🔧 创建exchange实例...")
-    exchange = ccxt.binanceusdm({
-        'apiKey': settings.binance_api_key,
-        'secret': settings.binance_api_secret,
-        'enableRateLimit': True,
-        'verbose': True,  # 启用详细日志
-        'urls': {
-            'api': {
-                'fapiPublic': 'https://testnet.binancefuture.com/fapi/v1',
-                'fapiPrivate': 'https://testnet.binancefuture.com/fapi/v1',
-                'fapiPrivateV2': 'https://testnet.binancefuture.com/fapi/v2',
-                'public': 'https://testnet.binancefuture.com/fapi/v1',
-                'private': 'https://testnet.binancefuture.com/fapi/v1',
+    # 所有请求（ccxt 和手动探测）共用一个会话，复用TCP/TLS连接
+    connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10)) as session:
+        # 2. 创建exchange
+        print(f"\n🔧 创建exchange实例...")
+        exchange = ccxt.binanceusdm({
+            'apiKey': settings.binance_api_key,
+            'secret': settings.binance_api_secret,
+            'enableRateLimit': True,
+            'session': session,  # 外部传入的会话由这里管理，ccxt 不会关闭
+            'verbose': verbose,  # 详细日志（--verbose 开启）
+            'urls': {'api': TESTNET_API_URLS},
+            'options': {
+                'defaultType': 'future'
             }
-        },
-        'options': {
-            'defaultType': 'future'
-        }
-    })
-    
-    # 3. 显示实际URLs
-    print(f"\n📡 Exchange URLs配置:")
-    print(json.dumps(exchange.urls, indent=2))
-    
-    # 4. 测试公共接口（不需要API Key）
-    print(f"\n✅ 测试1: 公共接口（不需要API Key）")
-    try:
-        ticker = await exchange.fetch_ticker('BTC/USDT:USDT')
-        print(f"   成功！BTC价格: ${ticker['last']}")
-    except Exception as e:
-        print(f"   失败: {e}")
-    
-    # 5. 测试私有接口（需要API Key）
-    print(f"\n🔐 测试2: 私有接口（需要API Key）")
-    print(f"   尝试获取账户余额...")
-    try:
-        balance = await exchange.fetch_balance()
-        print(f"   ✅ 成功！")
-        print(f"   USDT余额: {balance.get('USDT', {}).get('free', 0)}")
-    except ccxt.AuthenticationError as e:
-        print(f"   ❌ 认证失败: {e}")
-        print(f"\n🔍 问题分析:")
-        print(f"   1. API Key是否真的来自 testnet.binancefuture.com?")
-        print(f"   2. 登录 https://testnet.binancefuture.com 验证API Key是否存在")
-        print(f"   3. 检查API Key权限（需要勾选 'Enable Reading' 和 'Enable Futures'）")
-    except Exception as e:
-        print(f"   ❌ 其他错误: {e}")
-    
-    # 6. 手动测试API endpoint
-    print(f"\n🌐 测试3: 手动测试testnet endpoint")
-    print(f"   尝试访问: https://testnet.binancefuture.com/fapi/v1/time")
-    try:
-        import aiohttp
-        async with aiohttp.ClientSession() as session:
-            async with session.get('https://testnet.binancefuture.com/fapi/v1/time') as resp:
-                data = await resp.json()
-                print(f"   ✅ Testnet可访问！服务器时间: {data}")
-    except Exception as e:
-        print(f"   ❌ 无法访问testnet: {e}")
-    
-    await exchange.close()
+        })
+        
+        # 3. 显示实际URLs
+        print(f"\n📡 Exchange URLs配置:")
+        print(json.dumps(exchange.urls, indent=2))
+        
+        # 4-6. 三个探测互不依赖，并发执行后按顺序输出
+        results = await asyncio.gather(
+            _probe_public(exchange),
+            _probe_private(exchange),
+            _probe_raw(session),
+            return_exceptions=True
+        )
+        for lines in results:
+            if isinstance(lines, BaseException):
+                print(f"\n   ❌ 探测异常: {lines}")
+                continue
+            for line in lines:
+                print(line)
+        
+        await exchange.close()
     
     print(f"\n" + "=" * 70)
     print(f"💡 建议:")
@@ -97,5 +127,8 @@ async def diagnose():
     print(f"7. 复制新的API Key和Secret到 .env 文件")
 
 if __name__ == "__main__":
-    asyncio.run(diagnose())
+    parser = argparse.ArgumentParser(description='Binance testnet API diagnostics')
+    parser.add_argument('--verbose', action='store_true', help='Print full ccxt request/response logs')
+    args = parser.parse_args()
+    asyncio.run(diagnose(verbose=args.verbose))
 
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+测试后台写库线程 DatabaseWriter：写入顺序、call() 的 Future、stop() 写完剩余操作、
+线程未运行时的同步回退，以及队列积压时只丢弃价格写入
+"""
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.writer import DatabaseWriter
+
+
+class RecordingDB:
+    """记录调用顺序和执行线程的假数据库（与 TradingDatabase 同名的方法）"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def _record(self, *call):
+        self.calls.append(call)
+        self.threads.add(threading.current_thread().name)
+
+    def save_account_state(self, state):
+        self._record('save_account_state', state['total_value'])
+
+    def save_coin_prices_bulk(self, prices):
+        self._record('save_coin_prices_bulk', dict(prices))
+
+    def save_trade(self, trade):
+        self._record('save_trade', trade['symbol'])
+
+    def save_ai_decisions_batch(self, decisions):
+        self._record('save_ai_decisions_batch', len(decisions))
+
+    def set_config(self, key, value):
+        self._record('set_config', key, value)
+
+    def get_config(self, key):
+        self._record('get_config', key)
+        return '1000.0' if key == 'initial_balance' else None
+
+    def fail(self):
+        raise ValueError("boom")
+
+
+def test_writes_keep_submission_order():
+    """写操作按提交顺序执行；连续的单条价格写入合并为一次批量写入"""
+    db = RecordingDB()
+    writer = DatabaseWriter(db)
+    # 启动前提交，保证后台线程一次取出整批操作
+    writer.save_account_state({'total_value': 1})
+    writer.save_coin_price('BTC', {'price': 1})
+    writer.save_coin_price('ETH', {'price': 2})
+    writer.save_trade({'symbol': 'BTC/USDT:USDT'})
+    writer.save_coin_price('BTC', {'price': 3})
+    writer.save_coin_price('BTC', {'price': 4})
+    writer.set_config('initial_balance', '1000')
+    writer.start()
+    writer.stop()
+
+    assert db.calls == [
+        ('save_account_state', 1),
+        ('save_coin_prices_bulk', {'BTC': {'price': 1}, 'ETH': {'price': 2}}),
+        ('save_trade', 'BTC/USDT:USDT'),
+        # 同一币种重复出现时分两次写入，不覆盖前一条
+        ('save_coin_prices_bulk', {'BTC': {'price': 3}}),
+        ('save_coin_prices_bulk', {'BTC': {'price': 4}}),
+        ('set_config', 'initial_balance', '1000'),
+    ]
+    assert db.threads == {'db-writer'}
+
+
+def test_call_returns_future_after_queued_writes():
+    """call() 在写线程上排在之前的写操作之后执行，结果和异常通过 Future 返回"""
+    db = RecordingDB()
+    writer = DatabaseWriter(db)
+    writer.start()
+    try:
+        writer.save_trade({'symbol': 'ETH/USDT:USDT'})
+        assert writer.call('get_config', 'initial_balance').result(timeout=5) == '1000.0'
+        assert db.calls[0] == ('save_trade', 'ETH/USDT:USDT')
+
+        future = writer.call('fail')
+        try:
+            future.result(timeout=5)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+        # 协程中通过 asyncio.wrap_future 等待，不阻塞事件循环
+        async def read_config():
+            return await asyncio.wrap_future(writer.call('get_config', 'initial_balance'))
+        assert asyncio.run(read_config()) == '1000.0'
+    finally:
+        writer.stop()
+
+
+def test_stop_drains_pending_writes():
+    """stop() 写完队列中剩余的操作后才返回"""
+    db = RecordingDB()
+    writer = DatabaseWriter(db, max_batch=4)
+    writer.start()
+    for i in range(50):
+        writer.save_account_state({'total_value': i})
+    writer.stop()
+
+    assert [c[1] for c in db.calls] == list(range(50))
+    assert not writer._thread.is_alive()
+
+
+def test_call_runs_inline_without_thread():
+    """写线程未启动或已停止时 call() 直接在调用线程上执行"""
+    db = RecordingDB()
+    writer = DatabaseWriter(db)
+    assert writer.get_config('initial_balance') == '1000.0'
+
+    writer.start()
+    writer.stop()
+    assert writer.call('get_config', 'missing').result(timeout=0) is None
+    assert db.threads == {threading.current_thread().name}
+
+
+def test_full_queue_only_drops_prices():
+    """积压超过上限时丢弃价格写入，交易、决策、账户和配置写入不丢失"""
+    db = RecordingDB()
+    writer = DatabaseWriter(db, max_queue=2)
+    writer.save_coin_prices_bulk({'BTC': {'price': 1}})
+    writer.save_coin_prices_bulk({'ETH': {'price': 2}})
+    writer.save_coin_prices_bulk({'SOL': {'price': 3}})  # 已达上限，被丢弃
+    writer.save_coin_price('BNB', {'price': 4})          # 已达上限，被丢弃
+    writer.save_trade({'symbol': 'BTC/USDT:USDT'})
+    writer.save_ai_decisions_batch([1, 2, 3])
+    writer.save_account_state({'total_value': 5})
+    writer.set_config('initial_balance', '5')
+    writer.start()
+    writer.stop()
+
+    assert db.calls == [
+        ('save_coin_prices_bulk', {'BTC': {'price': 1}}),
+        ('save_coin_prices_bulk', {'ETH': {'price': 2}}),
+        ('save_trade', 'BTC/USDT:USDT'),
+        ('save_ai_decisions_batch', 3),
+        ('save_account_state', 5),
+        ('set_config', 'initial_balance', '5'),
+    ]
+
+
+if __name__ == "__main__":
+    for test in (
+        test_writes_keep_submission_order,
+        test_call_returns_future_after_queued_writes,
+        test_stop_drains_pending_writes,
+        test_call_runs_inline_without_thread,
+        test_full_queue_only_drops_prices,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -43,12 +43,14 @@ def test_simplified_no_action():
     }
     
     try:
-        # 测试每个币种
+        # 一次性验证全部币种（与生产环境解析路径一致），再逐个输出
+        decisions = TradingDecisions(**user_data)
         for coin, data in user_data.items():
             print(f"\n处理 {coin}:")
             print(f"  输入: {data}")
             
-            decision = CoinDecision(**data)
+            decision = getattr(decisions, coin)
+            assert isinstance(decision, CoinDecision)
             print(f"  ✅ 验证成功!")
             print(f"  Signal: {decision.signal}")
             print(f"  Leverage: {decision.leverage} (auto-filled)" if decision.leverage else f"  Leverage: None")
@@ -2,9 +2,12 @@
 """
 完整Prompt测试 - 查看完整构建后的AI提示词
 """
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 import asyncio
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
@@ -19,34 +22,55 @@ def print_section(title: str, content: str, max_lines: int = None):
     print("\n" + "=" * 100)
     print(f"📋 {title}")
     print("=" * 100)
-    if max_lines:
+    # 先计数再决定是否截断，只有需要截断时才拆分行
+    if max_lines and content.count('\n') + 1 > max_lines:
         lines = content.split('\n')
-        if len(lines) > max_lines:
-            print('\n'.join(lines[:max_lines]))
-            print(f"\n... ({len(lines) - max_lines} more lines) ...")
-            print('\n'.join(lines[-10:]))  # 显示最后10行
-        else:
-            print(content)
+        print('\n'.join(lines[:max_lines]))
+        print(f"\n... ({len(lines) - max_lines} more lines) ...")
+        print('\n'.join(lines[-10:]))  # 显示最后10行
     else:
         print(content)
     print("=" * 100)
 
 
+# Prompt 结构检查的关键标记：一次正则扫描找出所有出现的标记（maximum risk 不区分大小写）
+SECTION_MARKERS = {
+    "市场数据部分": "ALL BTC DATA",
+    "账户信息部分": "HERE IS YOUR ACCOUNT INFORMATION",
+    "风险管理规则": "RISK MANAGEMENT RULES",
+    "风险回报比计算": "Risk/Reward Ratio = Reward / Risk",
+    "格式说明": "OUTPUT FORMAT INSTRUCTIONS",
+    "具体数值示例": "EXAMPLE (LONG BTC",
+}
+_SECTION_RE = re.compile(
+    '|'.join(map(re.escape, SECTION_MARKERS.values())) + '|(?i:maximum risk)'
+)
+
+
+COINS = ('BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE')
+
+# K线序号（10根），模拟数据按序号线性递增
+BAR_INDEX = np.arange(10)
+
+
+@lru_cache(maxsize=16)
 def generate_mock_market_data(coin: str) -> dict:
-    """生成模拟市场数据"""
+    """生成模拟市场数据（按币种缓存，返回的数据各测试共享，不要修改）"""
     # 生成3分钟K线数据（最近10根）
     now = datetime.now()
-    dates = [now - timedelta(minutes=3*i) for i in range(10, 0, -1)]
+    dates = pd.date_range(end=now - timedelta(minutes=3), periods=10, freq='3min')
     
     base_price = {'BTC': 95000, 'ETH': 3500, 'SOL': 180, 'BNB': 600, 'XRP': 2.5, 'DOGE': 0.35}[coin]
+    idx = BAR_INDEX
     
+    intraday_base = base_price + idx*10
     intraday_data = {
         'timestamp': dates,
-        'open': [base_price + i*10 for i in range(10)],
-        'high': [base_price + i*10 + 50 for i in range(10)],
-        'low': [base_price + i*10 - 50 for i in range(10)],
-        'close': [base_price + i*10 + 20 for i in range(10)],
-        'volume': [100 + i*5 for i in range(10)],
+        'open': intraday_base,
+        'high': intraday_base + 50,
+        'low': intraday_base - 50,
+        'close': intraday_base + 20,
+        'volume': 100 + idx*5,
     }
     
     intraday_df = pd.DataFrame(intraday_data)
@@ -54,28 +78,29 @@ def generate_mock_market_data(coin: str) -> dict:
     # 添加指标
     intraday_df['ema_20'] = intraday_df['close'].rolling(window=5).mean()
     intraday_df['ema_50'] = intraday_df['close'].rolling(window=8).mean()
-    intraday_df['macd'] = [50 + i*2 for i in range(10)]
-    intraday_df['rsi_7'] = [50 + i for i in range(10)]
-    intraday_df['rsi_14'] = [52 + i for i in range(10)]
-    intraday_df['atr_14'] = [100 for _ in range(10)]
+    intraday_df['macd'] = 50 + idx*2
+    intraday_df['rsi_7'] = 50 + idx
+    intraday_df['rsi_14'] = 52 + idx
+    intraday_df['atr_14'] = 100
     
     # 生成4小时K线数据
-    longterm_dates = [now - timedelta(hours=4*i) for i in range(10, 0, -1)]
+    longterm_dates = pd.date_range(end=now - timedelta(hours=4), periods=10, freq='4h')
+    longterm_base = base_price + idx*100
     longterm_data = {
         'timestamp': longterm_dates,
-        'open': [base_price + i*100 for i in range(10)],
-        'high': [base_price + i*100 + 200 for i in range(10)],
-        'low': [base_price + i*100 - 200 for i in range(10)],
-        'close': [base_price + i*100 + 50 for i in range(10)],
-        'volume': [1000 + i*50 for i in range(10)],
+        'open': longterm_base,
+        'high': longterm_base + 200,
+        'low': longterm_base - 200,
+        'close': longterm_base + 50,
+        'volume': 1000 + idx*50,
     }
     
     longterm_df = pd.DataFrame(longterm_data)
     longterm_df['ema_20'] = longterm_df['close'].rolling(window=5).mean()
     longterm_df['ema_50'] = longterm_df['close'].rolling(window=8).mean()
-    longterm_df['macd'] = [100 + i*5 for i in range(10)]
-    longterm_df['rsi_14'] = [55 + i for i in range(10)]
-    longterm_df['atr_14'] = [200 for _ in range(10)]
+    longterm_df['macd'] = 100 + idx*5
+    longterm_df['rsi_14'] = 55 + idx
+    longterm_df['atr_14'] = 200
     
     return {
         'intraday_df': intraday_df,
@@ -103,10 +128,8 @@ def test_full_prompt_no_positions():
     
     positions = []
     
-    # 生成所有币种的市场数据
-    market_data = {}
-    for coin in ['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE']:
-        market_data[coin] = generate_mock_market_data(coin)
+    # 生成所有币种的市场数据（按币种缓存，两个测试共用）
+    market_data = {coin: generate_mock_market_data(coin) for coin in COINS}
     
     # 构建完整prompt
     full_prompt = pb.build_trading_prompt(
@@ -118,7 +141,7 @@ def test_full_prompt_no_positions():
     # 显示prompt统计
     print(f"\n📊 Prompt 统计:")
     print(f"   总长度: {len(full_prompt)} 字符")
-    print(f"   总行数: {len(full_prompt.split(chr(10)))} 行")
+    print(f"   总行数: {full_prompt.count(chr(10)) + 1} 行")
     print(f"   预估tokens: ~{len(full_prompt) // 4} tokens")
     
     # 显示部分内容（前50行和后50行）
@@ -171,10 +194,8 @@ def test_full_prompt_with_positions():
         }
     ]
     
-    # 生成所有币种的市场数据
-    market_data = {}
-    for coin in ['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE']:
-        market_data[coin] = generate_mock_market_data(coin)
+    # 生成所有币种的市场数据（按币种缓存，两个测试共用）
+    market_data = {coin: generate_mock_market_data(coin) for coin in COINS}
     
     # 构建完整prompt
     full_prompt = pb.build_trading_prompt(
@@ -186,7 +207,7 @@ def test_full_prompt_with_positions():
     # 显示prompt统计
     print(f"\n📊 Prompt 统计:")
     print(f"   总长度: {len(full_prompt)} 字符")
-    print(f"   总行数: {len(full_prompt.split(chr(10)))} 行")
+    print(f"   总行数: {full_prompt.count(chr(10)) + 1} 行")
     print(f"   预估tokens: ~{len(full_prompt) // 4} tokens")
     
     # 显示部分内容
@@ -306,26 +327,32 @@ def main():
     print("\n" + "🚀 完整 AI PROMPT 查看工具".center(100, "="))
     print("目的: 查看完整构建后的AI提示词，包含市场数据、账户信息、风险规则等\n")
     
-    # 测试完整prompt - 无持仓
-    print("\n" + "1️⃣  构建无持仓情况的完整Prompt".center(100, "-"))
-    full_prompt_1 = test_full_prompt_no_positions()
-    
-    # 测试完整prompt - 有持仓
-    print("\n" + "2️⃣  构建有持仓情况的完整Prompt".center(100, "-"))
-    full_prompt_2 = test_full_prompt_with_positions()
-    
-    # 保存完整prompt到文件
     output_dir = Path(__file__).parent / "logs"
     output_dir.mkdir(exist_ok=True)
-    
     file1 = output_dir / "full_prompt_no_positions.txt"
     file2 = output_dir / "full_prompt_with_positions.txt"
     
+    # 每个prompt构建后立即写入文件并只保留统计信息，内存中同时只有一个完整prompt
+    # 测试完整prompt - 无持仓
+    print("\n" + "1️⃣  构建无持仓情况的完整Prompt".center(100, "-"))
+    full_prompt = test_full_prompt_no_positions()
     with open(file1, "w", encoding="utf-8") as f:
-        f.write(full_prompt_1)
+        f.write(full_prompt)
+    
+    # 提取关键部分
+    found = {m.group(0) for m in _SECTION_RE.finditer(full_prompt)}
+    sections = {name: marker in found for name, marker in SECTION_MARKERS.items()}
+    sections["最大风险金额"] = "$" in full_prompt and any(m.lower() == "maximum risk" for m in found)
+    len_1 = len(full_prompt)
+    del full_prompt
     
+    # 测试完整prompt - 有持仓
+    print("\n" + "2️⃣  构建有持仓情况的完整Prompt".center(100, "-"))
+    full_prompt = test_full_prompt_with_positions()
     with open(file2, "w", encoding="utf-8") as f:
-        f.write(full_prompt_2)
+        f.write(full_prompt)
+    len_2 = len(full_prompt)
+    del full_prompt
     
     print("\n" + "=" * 100)
     print("💾 完整Prompt已保存到:")
@@ -337,17 +364,6 @@ def main():
     # 内容分析
     print("\n" + "📊 Prompt 结构分析".center(100, "="))
     
-    # 提取关键部分
-    sections = {
-        "市场数据部分": "ALL BTC DATA" in full_prompt_1,
-        "账户信息部分": "HERE IS YOUR ACCOUNT INFORMATION" in full_prompt_1,
-        "风险管理规则": "RISK MANAGEMENT RULES" in full_prompt_1,
-        "风险回报比计算": "Risk/Reward Ratio = Reward / Risk" in full_prompt_1,
-        "格式说明": "OUTPUT FORMAT INSTRUCTIONS" in full_prompt_1,
-        "具体数值示例": "EXAMPLE (LONG BTC" in full_prompt_1,
-        "最大风险金额": "$" in full_prompt_1 and "maximum risk" in full_prompt_1.lower(),
-    }
-    
     print("\n✅ 关键部分检查:")
     for section_name, exists in sections.items():
         status = "✅" if exists else "❌"
@@ -355,13 +371,18 @@ def main():
     
     # 对比两个prompt
     print(f"\n📏 Prompt大小对比:")
-    print(f"   无持仓: {len(full_prompt_1):,} 字符 (~{len(full_prompt_1)//4:,} tokens)")
-    print(f"   有持仓: {len(full_prompt_2):,} 字符 (~{len(full_prompt_2)//4:,} tokens)")
-    print(f"   差异: {abs(len(full_prompt_2) - len(full_prompt_1)):,} 字符")
+    print(f"   无持仓: {len_1:,} 字符 (~{len_1//4:,} tokens)")
+    print(f"   有持仓: {len_2:,} 字符 (~{len_2//4:,} tokens)")
+    print(f"   差异: {abs(len_2 - len_1):,} 字符")
     
     print("\n" + "=" * 100)
 
 
 if __name__ == "__main__":
-    main()
+    # 输出为整段prompt文本，关闭行缓冲按块写出（终端下不再每行一次系统调用），结束时统一刷新
+    sys.stdout.reconfigure(line_buffering=False)
+    try:
+        main()
+    finally:
+        sys.stdout.flush()
 
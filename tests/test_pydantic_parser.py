@@ -9,6 +9,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from ai.output_parser import trading_parser, parse_trading_decision
 from ai.decision_models import TradingDecisions
 
+# 格式说明是静态文本，整个测试模块只生成一次
+FORMAT_INSTRUCTIONS = trading_parser.get_format_instructions()
+
 
 def test_nested_format():
     """Test nof1.ai nested format with trade_signal_args."""
@@ -213,7 +216,7 @@ def test_format_instructions():
     print("Test 6: Format Instructions")
     print("=" * 60)
     
-    instructions = trading_parser.get_format_instructions()
+    instructions = FORMAT_INSTRUCTIONS
     
     if len(instructions) > 100:
         print(f"✅ SUCCESS: Generated {len(instructions)} chars of instructions")
@@ -47,7 +47,10 @@ print()
 async def test_market_data():
     """Test fetching real market data."""
     
-    # Test 3: Load markets
+    # 共享HTTP会话（连接池 + DNS缓存），后续所有请求复用连接
+    exchange.open()
+    
+    # Test 3: Load markets（只加载一次，ExchangeClient 记录 markets_loaded）
     print("🔄 Test 3: Loading markets...")
     try:
         await exchange.load_markets()
@@ -69,9 +72,9 @@ async def test_market_data():
         # Fetch 3-minute data
         df_3m = await exchange.fetch_ohlcv(test_symbol, '3m', limit=10)
         print(f"   ✓ Fetched {len(df_3m)} candles (3-minute)")
-        print(f"   ✓ Latest price: ${df_3m.iloc[-1]['close']:.2f}")
-        print(f"   ✓ Latest volume: {df_3m.iloc[-1]['volume']:.2f}")
-        print(f"   ✓ Time range: {df_3m.iloc[0]['timestamp']} to {df_3m.iloc[-1]['timestamp']}")
+        print(f"   ✓ Latest price: ${df_3m['close'].iat[-1]:.2f}")
+        print(f"   ✓ Latest volume: {df_3m['volume'].iat[-1]:.2f}")
+        print(f"   ✓ Time range: {df_3m['timestamp'].iat[0]} to {df_3m['timestamp'].iat[-1]}")
         
         # Add indicators
         df_with_indicators = IndicatorEngine.add_all_indicators(df_3m)
@@ -141,9 +144,12 @@ async def test_market_data():
     print("⏱️  Test 8: Fetching multiple timeframes...")
     try:
         timeframes = ['1m', '5m', '15m', '1h', '4h']
-        for tf in timeframes:
-            df = await exchange.fetch_ohlcv(test_symbol, tf, limit=5)
-            print(f"   ✓ {tf:4s}: {len(df)} candles, latest price: ${df.iloc[-1]['close']:.2f}")
+        # 各周期请求互不依赖，并发发出（ccxt 的 enableRateLimit 仍会限速）
+        frames = await asyncio.gather(*(
+            exchange.fetch_ohlcv(test_symbol, tf, limit=5) for tf in timeframes
+        ))
+        for tf, df in zip(timeframes, frames):
+            print(f"   ✓ {tf:4s}: {len(df)} candles, latest price: ${df['close'].iat[-1]:.2f}")
         print("✅ Multiple timeframes fetched successfully")
     except Exception as e:
         print(f"❌ Failed to fetch multiple timeframes: {e}")
@@ -155,9 +161,14 @@ async def test_market_data():
     print(f"   Trading pairs: {', '.join(config.trading_pairs)}")
     
     all_prices = {}
-    for pair in config.trading_pairs:
+    tickers = await asyncio.gather(
+        *(exchange.fetch_ticker(pair) for pair in config.trading_pairs),
+        return_exceptions=True
+    )
+    for pair, ticker in zip(config.trading_pairs, tickers):
         try:
-            ticker = await exchange.fetch_ticker(pair)
+            if isinstance(ticker, Exception):
+                raise ticker
             all_prices[pair] = ticker['last']
             coin = pair.split('/')[0]
             print(f"   ✓ {coin:6s}: ${ticker['last']:>10,.2f}")
@@ -193,12 +204,6 @@ async def test_market_data():
     print("   3. The bot will collect data → analyze with AI → execute trades")
     print()
     print("=" * 80)
-    
-    # Properly close the exchange connection
-    try:
-        await exchange.exchange.close()
-    except Exception as e:
-        print(f"\n⚠️  Warning: Failed to close exchange cleanly: {e}")
 
 
 # Run async tests
@@ -57,19 +57,19 @@ try:
     
     # Create sample OHLCV data
     dates = pd.date_range(start='2025-01-01', periods=100, freq='1h')
+    rng = np.random.default_rng(0)
+    # 四列随机游走一次生成（列顺序: open, high, low, close）
+    walks = rng.standard_normal((100, 4)).cumsum(axis=0) + np.array([100, 102, 98, 100])
     df = pd.DataFrame({
         'timestamp': dates,
-        'open': 100 + np.random.randn(100).cumsum(),
-        'high': 102 + np.random.randn(100).cumsum(),
-        'low': 98 + np.random.randn(100).cumsum(),
-        'close': 100 + np.random.randn(100).cumsum(),
-        'volume': np.random.randint(1000, 10000, 100)
+        'open': walks[:, 0],
+        # Make sure high is highest and low is lowest
+        'high': walks.max(axis=1),
+        'low': walks.min(axis=1),
+        'close': walks[:, 3],
+        'volume': rng.integers(1000, 10000, 100)
     })
     
-    # Make sure high is highest and low is lowest
-    df['high'] = df[['open', 'high', 'low', 'close']].max(axis=1)
-    df['low'] = df[['open', 'high', 'low', 'close']].min(axis=1)
-    
     # Test indicators
     print("   Testing EMA calculation...")
     ema = IndicatorEngine.calculate_ema(df, period=20)
@@ -2,20 +2,32 @@
 """
 测试AI Thinking提取功能 - 简化版
 """
-import re
+from typing import Optional
+
+
+def _tag_content(text: str, open_tag: str, close_tag: str) -> Optional[str]:
+    """返回第一个 open_tag 与其后第一个 close_tag 之间的内容（复制自llm_interface.py）"""
+    start = text.find(open_tag)
+    if start == -1:
+        return None
+    start += len(open_tag)
+    end = text.find(close_tag, start)
+    if end == -1:
+        return None
+    return text[start:end]
 
 
 def extract_thinking(response_text: str) -> str:
     """从LLM响应中提取thinking部分（复制自llm_interface.py）"""
     # 尝试提取<think>标签
-    think_match = re.search(r'<think>(.*?)</think>', response_text, re.DOTALL)
-    if think_match:
-        return think_match.group(1).strip()
+    thinking = _tag_content(response_text, '<think>', '</think>')
+    if thinking is not None:
+        return thinking.strip()
     
     # 尝试提取<reasoning>标签
-    reasoning_match = re.search(r'<reasoning>(.*?)</reasoning>', response_text, re.DOTALL)
-    if reasoning_match:
-        return reasoning_match.group(1).strip()
+    reasoning = _tag_content(response_text, '<reasoning>', '</reasoning>')
+    if reasoning is not None:
+        return reasoning.strip()
     
     return ""
 
@@ -1,18 +1,27 @@
 """Entry point for Web API Server (separate from trading bot)."""
 
 import asyncio
+import atexit
 import logging
+import queue
 import sys
-import signal
 import argparse
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+from logging.handlers import QueueHandler, QueueListener
 
+# 以 src 包路径导入（脚本所在目录即项目根目录，已在 sys.path 中）
 from src.web.api_server import WebAPIServer
 from src.database import TradingDatabase
 from src.config import settings
+from src.event_loop import install_event_loop_policy
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """只入队、不格式化的 QueueHandler（队列只在本进程内传递，记录无需 pickle）"""
+    
+    def prepare(self, record):
+        # 默认 prepare() 会在调用线程上执行 msg % args 合并和 traceback 渲染，
+        # 这里原样入队，全部留给 QueueListener 的后台线程
+        return record
 
 
 def setup_logging():
@@ -21,12 +30,18 @@ def setup_logging():
     date_format = '%Y-%m-%d %H:%M:%S'
     
     # Configure logging - only console output
+    # 事件循环线程只把日志记录放入队列，消息合并、格式化和写stdout都由后台线程完成
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler)
+    listener.start()
+    atexit.register(listener.stop)  # 退出时写完队列中剩余的日志
+    
     logging.basicConfig(
         level=logging.INFO,
-        format=log_format,
-        datefmt=date_format,
         handlers=[
-            logging.StreamHandler(sys.stdout)
+            _InProcessQueueHandler(log_queue)
         ]
     )
     
@@ -44,6 +59,12 @@ def parse_args():
         default=8541,
         help='Port number (default: 8541)'
     )
+    parser.add_argument(
+        '--compress-min-size',
+        type=int,
+        default=1024,
+        help='Gzip responses larger than this many bytes, 0 disables (default: 1024)'
+    )
     parser.add_argument(
         '--db-type',
         choices=['sqlite', 'mysql'],
@@ -90,6 +111,7 @@ async def main():
     logger.info("=" * 80)
     logger.info("AI TRADING MONITOR - Web API Server")
     logger.info("=" * 80)
+    logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
     
     # Prepare database configuration
     # Priority: command line args > environment variables (settings) > defaults
@@ -135,19 +157,11 @@ async def main():
     
     # Create Web API server
     # Note: running_callback is None since bot runs in separate process
-    web_server = WebAPIServer(db=db, port=args.port, running_callback=None)
-    
-    # Set up signal handlers for graceful shutdown
-    shutdown_event = asyncio.Event()
-    
-    def signal_handler(signum, frame):
-        """Handle interrupt signals (Ctrl+C)."""
-        logger.info("\n⚠️  Received interrupt signal, initiating graceful shutdown...")
-        shutdown_event.set()
+    web_server = WebAPIServer(db=db, port=args.port, running_callback=None,
+                              compress_min_size=args.compress_min_size)
     
-    # Register signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # SIGINT/SIGTERM 由 uvicorn 的 Server.serve() 通过 loop.add_signal_handler 处理（优雅关闭），
+    # 这里不再注册 signal.signal 回调（会被 uvicorn 覆盖）
     
     try:
         # Start web server
@@ -163,10 +177,14 @@ async def main():
         await web_server.stop()
         sys.exit(1)
     finally:
+        # 释放连接池中的数据库连接
+        db.db_manager.close()
         logger.info("👋 Web server stopped")
 
 
 if __name__ == "__main__":
+    # uvicorn 在已有事件循环中运行（server.serve()），需在创建循环前设置策略
+    install_event_loop_policy()
     try:
         asyncio.run(main())
     except KeyboardInterrupt: